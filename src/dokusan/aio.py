@@ -0,0 +1,85 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from dokusan import generators, solvers, stats
+from dokusan.boards import BoxSize, Sudoku
+from dokusan.search import Branching, Budget
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def default_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(thread_name_prefix="dokusan")
+    return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+
+async def backtrack(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    executor: Optional[Executor] = None,
+) -> Sudoku:
+    budget = Budget() if budget is None else budget
+    return await _run(
+        functools.partial(
+            solvers.backtrack, sudoku, budget=budget, branching=branching
+        ),
+        budget,
+        executor,
+    )
+
+
+async def rank(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    executor: Optional[Executor] = None,
+) -> int:
+    budget = Budget() if budget is None else budget
+    return await _run(
+        functools.partial(stats.rank, sudoku, budget=budget, branching=branching),
+        budget,
+        executor,
+    )
+
+
+async def random_sudoku(
+    avg_rank: int = 150,
+    box_size: BoxSize = BoxSize(3, 3),
+    budget: Optional[Budget] = None,
+    executor: Optional[Executor] = None,
+) -> Sudoku:
+    budget = Budget() if budget is None else budget
+    return await _run(
+        functools.partial(
+            generators.random_sudoku, avg_rank, box_size=box_size, budget=budget
+        ),
+        budget,
+        executor,
+    )
+
+
+async def _run(
+    func: Callable[[], T], budget: Budget, executor: Optional[Executor]
+) -> T:
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor or default_executor(), func)
+    try:
+        return await future
+    except asyncio.CancelledError:
+        # the thread can't be interrupted, the search stops on the budget flag
+        budget.cancel()
+        raise
@@ -1,7 +1,17 @@
-import itertools
+import functools
 import string
-from dataclasses import dataclass, field
-from typing import Iterator, List, NamedTuple, Optional, Set, Tuple, Type, TypeVar
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 T = TypeVar("T", bound="Sudoku")
 
@@ -28,21 +38,88 @@ class BoxSize(NamedTuple):
         return (row // self.width) * self.width + (column // self.length)
 
     def indexes(self, row: int, column: int) -> Iterator[Tuple[int, int]]:
-        return itertools.product(
-            (i + row // self.width * self.width for i in range(self.length)),
-            (j + column // self.width * self.width for j in range(self.length)),
-        )
+        return iter(_boxes(self)[self.sequential(row, column)])
+
+
+@functools.lru_cache(maxsize=None)
+def _boxes(box_size: BoxSize) -> List[List[Tuple[int, int]]]:
+    # box is `width` rows high and `length` columns wide
+    size = box_size.width * box_size.length
+    boxes: List[List[Tuple[int, int]]] = [[] for _ in range(size)]
+    for i in range(size):
+        for j in range(size):
+            boxes[box_size.sequential(i, j)].append((i, j))
+    return boxes
 
 
-@dataclass
 class Cell:
-    position: Position
-    value: Optional[int] = None
-    candidates: Set[int] = field(default_factory=set)
+    __slots__ = ("position", "value", "candidates")
 
-    def __post_init__(self):
-        if self.value and self.candidates:
+    def __init__(
+        self,
+        position: Position,
+        value: Optional[int] = None,
+        candidates: Optional[Set[int]] = None,
+    ):
+        if value and candidates:
             raise ValueError("`value` and `candidates` attrs are mutually exclusive")
+        self.position = position
+        self.value = value
+        self.candidates = set() if candidates is None else candidates
+
+    @classmethod
+    def unchecked(
+        cls,
+        position: Position,
+        value: Optional[int] = None,
+        candidates: Optional[Set[int]] = None,
+    ) -> "Cell":
+        # skips validation, for cells built by techniques and solvers
+        cell = object.__new__(cls)
+        cell.position = position
+        cell.value = value
+        cell.candidates = set() if candidates is None else candidates
+        return cell
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.position, self.value, self.candidates) == (
+            other.position,  # type: ignore
+            other.value,  # type: ignore
+            other.candidates,  # type: ignore
+        )
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return (
+            f"Cell(position={self.position!r}, value={self.value!r}, "
+            f"candidates={self.candidates!r})"
+        )
+
+
+class _Layout(NamedTuple):
+    units: List[List[Tuple[int, int]]]
+    membership: Dict[Tuple[int, int], List[int]]
+    crosses: Dict[Tuple[int, int], FrozenSet[Tuple[int, int]]]
+
+
+@functools.lru_cache(maxsize=None)
+def _layout(box_size: BoxSize) -> _Layout:
+    size = box_size.width * box_size.length
+    rows = [[(i, j) for j in range(size)] for i in range(size)]
+    columns = [[(j, i) for j in range(size)] for i in range(size)]
+    units = rows + columns + [list(box) for box in _boxes(box_size)]
+    membership: Dict[Tuple[int, int], List[int]] = {}
+    for unit, positions in enumerate(units):
+        for position in positions:
+            membership.setdefault(position, []).append(unit)
+    crosses = {
+        position: frozenset().union(*(units[unit] for unit in unit_ids))
+        for position, unit_ids in membership.items()
+    }
+    return _Layout(units=units, membership=membership, crosses=crosses)
 
 
 class Sudoku:
@@ -50,12 +127,15 @@ class Sudoku:
         self.box_size = box_size
         self.size = box_size.width * box_size.length
         self._sudoku = {
-            (i, j): Cell(position=Position(i, j, box_size.sequential(i, j)))
+            (i, j): Cell.unchecked(Position(i, j, box_size.sequential(i, j)))
             for i in range(self.size)
             for j in range(self.size)
         }
         for cell in cells:
             self._sudoku[cell.position[:2]] = cell
+        self._trail: Optional[List[Cell]] = None
+        self._layout = _layout(box_size)
+        self._views: List[Optional[Tuple[Cell, ...]]] = [None] * len(self._layout.units)
 
     @classmethod
     def from_list(cls: Type[T], puzzle: List[List[int]], box_size: BoxSize) -> T:
@@ -72,16 +152,26 @@ class Sudoku:
         return cls(*cells, box_size=box_size)
 
     @classmethod
-    def from_string(cls: Type[T], puzzle: str, box_size: BoxSize) -> T:
+    def from_string(
+        cls: Type[T], puzzle: str, box_size: BoxSize, delimiter: Optional[str] = None
+    ) -> T:
         size = box_size.width * box_size.length
+        if delimiter is None:
+            values = [STR_TO_DIGIT_MAP.get(value, 0) for value in puzzle]
+        else:
+            separator = delimiter.strip() or None
+            tokens = []
+            for line in puzzle.strip().splitlines():
+                fields = line.strip().split(separator)
+                # a delimiter at the end of line doesn't start a new cell
+                if fields and not fields[-1].strip():
+                    fields.pop()
+                tokens.extend(fields)
+            values = [int(t) if t.strip().isdigit() else 0 for t in tokens]
+            if len(values) != size * size:
+                raise ValueError(f"Expected {size * size} values, got {len(values)}")
         return cls.from_list(
-            [
-                [
-                    STR_TO_DIGIT_MAP.get(value, 0)
-                    for value in puzzle[i * size : i * size + size]
-                ]
-                for i in range(size)
-            ],
+            [values[i * size : i * size + size] for i in range(size)],
             box_size=box_size,
         )
 
@@ -95,59 +185,73 @@ class Sudoku:
             for row in self.rows()
         )
 
+    def to_string(self, delimiter: Optional[str] = None) -> str:
+        if delimiter is None:
+            return str(self)
+        return delimiter.join(
+            str(cell.value or 0) for row in self.rows() for cell in row
+        )
+
     def __getitem__(self, key: Tuple[int, int]) -> Cell:
         return self._sudoku[key]
 
     def update(self, cells: List[Cell]) -> None:
-        self._sudoku.update((cell.position[:2], cell) for cell in cells)
+        if self._trail is not None:
+            self._trail.extend(self._sudoku[cell.position[:2]] for cell in cells)
+        for cell in cells:
+            self._set(cell)
+
+    def mark(self) -> int:
+        if self._trail is None:
+            self._trail = []
+        return len(self._trail)
+
+    def undo_to(self, mark: int) -> None:
+        trail = self._trail or []
+        while len(trail) > mark:
+            self._set(trail.pop())
+
+    def release(self) -> None:
+        # stops recording changes, marks taken before can't be undone anymore
+        self._trail = None
 
     def cells(self) -> Iterator[Cell]:
         return iter(self._sudoku.values())
 
     def rows(self) -> Iterator[List[Cell]]:
-        return ([self[i, j] for j in range(self.size)] for i in range(self.size))
+        return (list(self._view(i)) for i in range(self.size))
 
     def columns(self) -> Iterator[List[Cell]]:
-        return ([self[j, i] for j in range(self.size)] for i in range(self.size))
+        return (list(self._view(i)) for i in range(self.size, self.size * 2))
 
     def boxes(self) -> Iterator[List[Cell]]:
-        return (
-            [self[x, y] for x, y in self.box_size.indexes(i, j)]
-            for i in range(0, self.size, self.box_size.length)
-            for j in range(0, self.size, self.box_size.width)
-        )
+        return (list(self._view(i)) for i in range(self.size * 2, len(self._views)))
 
     def groups(self) -> Iterator[List[Cell]]:
-        return itertools.chain(self.rows(), self.columns(), self.boxes())
+        return (list(self._view(i)) for i in range(len(self._views)))
 
     def is_solved(self) -> bool:
-        for group in self.groups():
+        for group in map(self._view, range(len(self._views))):
             if len({cell.value for cell in group if cell.value}) != self.size:
                 return False
         return True
 
     def is_valid(self) -> bool:
-        for group in self.groups():
+        for group in map(self._view, range(len(self._views))):
             values = [cell.value for cell in group if cell.value]
             if len(set(values)) != len(values):
                 return False
         return True
 
     def intersection(self, *cells: Cell) -> List[Cell]:
-        intersections: Set[Tuple[int, int]] = set()
-        for i, cell in enumerate(cells):
-            row, column = cell.position.row, cell.position.column
-            cross = set.union(
-                {(row, i) for i in range(self.size)},
-                {(i, column) for i in range(self.size)},
-                {(i, j) for i, j in self.box_size.indexes(row, column)},
-            )
-            if i == 0:
-                intersections |= cross
-            else:
-                intersections &= cross
+        if not cells:
+            return []
+        crosses = self._layout.crosses
+        intersections = set(crosses[cells[0].position[:2]])
+        for cell in cells[1:]:
+            intersections &= crosses[cell.position[:2]]
         intersections -= {(cell.position.row, cell.position.column) for cell in cells}
-        return [self[position] for position in intersections]
+        return [self._sudoku[position] for position in intersections]
 
     def is_intersects(self, cell_a: Cell, cell_b: Cell) -> bool:
         return cell_a.position != cell_b.position and (
@@ -155,3 +259,18 @@ class Sudoku:
             or cell_a.position.column == cell_b.position.column
             or cell_a.position.box == cell_b.position.box
         )
+
+    def _set(self, cell: Cell) -> None:
+        key = cell.position[:2]
+        self._sudoku[key] = cell
+        # views handed out earlier stay untouched, affected ones are rebuilt
+        for unit in self._layout.membership.get(key, ()):
+            self._views[unit] = None
+
+    def _view(self, unit: int) -> Tuple[Cell, ...]:
+        # callers get copies, so the cached view can't be changed from outside
+        view = self._views[unit]
+        if view is None:
+            view = tuple([self._sudoku[key] for key in self._layout.units[unit]])
+            self._views[unit] = view
+        return view
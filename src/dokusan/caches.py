@@ -0,0 +1,85 @@
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from dokusan.boards import Sudoku
+
+
+class Cache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        path: Optional[str] = None,
+        maxbytes: Optional[int] = None,
+    ):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+        if self.path is not None:
+            row = (
+                self._connect()
+                .execute("SELECT value FROM cache WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is not None:
+                self._remember(key, row[0])
+                self.hits += 1
+                return row[0]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        self._remember(key, value)
+        if self.path is not None:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                    (key, value),
+                )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # connection can't be pickled, each process opens its own
+        return {**self.__dict__, "_db": None}
+
+    def _remember(self, key: str, value: bytes) -> None:
+        if key in self._items:
+            self.nbytes -= len(key) + len(self._items[key])
+        self._items[key] = value
+        self._items.move_to_end(key)
+        self.nbytes += len(key) + len(value)
+        while len(self._items) > self.maxsize or (
+            self.maxbytes is not None and self.nbytes > self.maxbytes
+        ):
+            evicted, evicted_value = self._items.popitem(last=False)
+            self.nbytes -= len(evicted) + len(evicted_value)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            assert self.path is not None
+            self._db = sqlite3.connect(self.path, timeout=30)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB)"
+            )
+        return self._db
+
+
+def key(sudoku: Sudoku) -> str:
+    # values only, with box size, since the same string fits different boxes
+    width, length = sudoku.box_size
+    delimiter = "," if sudoku.size > 9 else None
+    return f"{width}x{length}:{sudoku.to_string(delimiter=delimiter)}"
@@ -1,3 +1,11 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dokusan.search import SearchStats
+
+
 class DokusanError(Exception):
     pass
 
@@ -16,3 +24,16 @@ class MultipleSolutions(DokusanError):
 
 class Unsolvable(DokusanError):
     pass
+
+
+class Cancelled(DokusanError):
+    pass
+
+
+class BudgetExceeded(DokusanError):
+    def __init__(self, message: str, stats: SearchStats):
+        super().__init__(message)
+        self.stats = stats
+
+    def __reduce__(self):
+        return self.__class__, (str(self), self.stats)
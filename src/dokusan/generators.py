@@ -1,15 +1,32 @@
+import itertools
 import random
-from typing import List
+from typing import List, Optional
 
-from dokusan import exceptions, solvers, stats
+from dokusan import exceptions, search, solvers, stats
 from dokusan.boards import BoxSize, Cell, Position, Sudoku
+from dokusan.caches import Cache
+from dokusan.search import Budget
 
 MAX_ITERATIONS = 300
 
 
-def random_sudoku(avg_rank: int = 150, box_size: BoxSize = BoxSize(3, 3)) -> Sudoku:
+def random_sudoku(
+    avg_rank: int = 150,
+    box_size: BoxSize = BoxSize(3, 3),
+    budget: Optional[Budget] = None,
+    cache: Optional[Cache] = None,
+) -> Sudoku:
+    if budget is None:
+        return _random_sudoku(avg_rank, box_size, None, cache)
+    with budget.shared():
+        return _random_sudoku(avg_rank, box_size, budget, cache)
+
+
+def _random_sudoku(
+    avg_rank: int, box_size: BoxSize, budget: Optional[Budget], cache: Optional[Cache]
+) -> Sudoku:
     sudoku = Sudoku(*_random_initial_cells(box_size), box_size=box_size)
-    solution = solvers.backtrack(sudoku)
+    solution = solvers.backtrack(sudoku, budget=budget, cache=cache)
 
     iterations = min(avg_rank, MAX_ITERATIONS)
     for i in range(iterations):
@@ -20,13 +37,23 @@ def random_sudoku(avg_rank: int = 150, box_size: BoxSize = BoxSize(3, 3)) -> Sud
         if all(cell.value for cell in cells):
             solution.update([Cell(position=cell.position) for cell in cells])
             try:
-                stats.rank(solution)
+                _check_unique(solution, budget=budget)
             except exceptions.MultipleSolutions:
                 solution.update(cells)
 
     return solution
 
 
+def _check_unique(sudoku: Sudoku, budget: Optional[Budget] = None) -> None:
+    if sudoku.size < solvers.LARGE_BOARD_SIZE:
+        stats.rank(sudoku, budget=budget)
+        return
+
+    solutions = search.bitmask_search(sudoku, budget=budget)
+    if len(list(itertools.islice(solutions, 2))) > 1:
+        raise exceptions.MultipleSolutions
+
+
 def _random_initial_cells(box_size: BoxSize) -> List[Cell]:
     size = box_size.width * box_size.length
     all_values = set(range(1, size + 1))
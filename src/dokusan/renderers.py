@@ -1,7 +1,22 @@
+import functools
+import io
 from enum import Enum
-from typing import List, NamedTuple, Protocol
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
+
+from dokusan.boards import DIGIT_TO_STR_MAP, BoxSize, Cell, Sudoku
+from dokusan.techniques import Step
 
-from dokusan.boards import BoxSize, Cell, Sudoku
+_CHARS = [DIGIT_TO_STR_MAP[i] for i in range(len(DIGIT_TO_STR_MAP))]
 
 
 class Color(Protocol):
@@ -9,6 +24,19 @@ class Color(Protocol):
         ...
 
 
+class Stream(Protocol):
+    def write(self, s: str) -> int:
+        ...
+
+
+class Renderer(Protocol):
+    def __call__(self, sudoku: Sudoku) -> str:
+        ...
+
+    def write(self, sudoku: Sudoku, stream: Stream) -> None:
+        ...
+
+
 class TermColor(Enum):
     BOLD = "\033[;1m"
     RED = "\033[91m"
@@ -29,6 +57,14 @@ class NoColor:
         return str(value)
 
 
+class Tag(NamedTuple):
+    name: str
+    css: str
+
+    def __call__(self, value: int) -> str:
+        return f'<{self.name} class="{self.css}">{value}</{self.name}>'
+
+
 class Colors(NamedTuple):
     value: Color
     candidate: Color
@@ -41,6 +77,7 @@ class Separator(NamedTuple):
     interbox: str
     left: str
 
+    @functools.lru_cache(maxsize=None)
     def __call__(self, box_size: BoxSize) -> str:
         size = box_size.length * box_size.width
         items = [f"{self.right}"]
@@ -62,6 +99,7 @@ class Border(NamedTuple):
     intercol: Separator
     bottom: Separator
 
+    @functools.lru_cache(maxsize=None)
     def template(self, box_size: BoxSize) -> str:
         size = box_size.width * box_size.length
         result = [self.top(box_size)]
@@ -76,20 +114,47 @@ class Border(NamedTuple):
 
         return "\n".join(result)
 
+    @functools.lru_cache(maxsize=None)
+    def chunks(self, box_size: BoxSize) -> Tuple[str, ...]:
+        return tuple(self.template(box_size).split("{}"))
+
+
+_RowState = Tuple[Tuple[Optional[int], FrozenSet[int]], ...]
+
 
 class TermRenderer:
     def __init__(self, border: Border, colors: Colors):
         self.border = border
         self.colors = colors
+        self._rows: Dict[Tuple[BoxSize, int], Tuple[_RowState, str]] = {}
 
     def __call__(self, sudoku: Sudoku) -> str:
-        rows = [
-            [self.render_cell(cell, sudoku.box_size) for cell in row]
-            for row in sudoku.rows()
-        ]
+        box_size = sudoku.box_size
+        template = self.border.template(box_size)
+        return template.format(
+            *[self._render(i, row, box_size) for i, row in enumerate(sudoku.rows())]
+        )
+
+    def write(self, sudoku: Sudoku, stream: Stream) -> None:
+        box_size = sudoku.box_size
+        chunks = self.border.chunks(box_size)
+        for i, row in enumerate(sudoku.rows()):
+            stream.write(chunks[i])
+            stream.write(self._render(i, row, box_size))
+        stream.write(chunks[-1])
 
-        template = self.border.template(sudoku.box_size)
-        return template.format(*[self.render_row(row, sudoku.box_size) for row in rows])
+    def _render(self, index: int, row: List[Cell], box_size: BoxSize) -> str:
+        # only rows that changed since the previous call are rendered again,
+        # contents are compared since cells may be changed in place
+        state = tuple([(cell.value, frozenset(cell.candidates)) for cell in row])
+        cached = self._rows.get((box_size, index))
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        rendered = self.render_row(
+            [self.render_cell(cell, box_size) for cell in row], box_size
+        )
+        self._rows[box_size, index] = (state, rendered)
+        return rendered
 
     def render_cell(self, cell: Cell, box_size: BoxSize) -> List[List[str]]:
         width, length = box_size
@@ -109,13 +174,228 @@ class TermRenderer:
         return result
 
     def render_row(self, row: List[List[List[str]]], box_size: BoxSize) -> str:
+        intercol = self.border.intercol(box_size)
         result = []
         for cell in zip(*row):
             subrow = [value for values in cell for value in values]
-            result.append(self.border.intercol(box_size).format(*subrow))
+            result.append(intercol.format(*subrow))
         return "\n".join(result)
 
 
+class TextRenderer(NamedTuple):
+    delimiter: str = ""
+    newline: str = ""
+
+    def __call__(self, sudoku: Sudoku) -> str:
+        stream = io.StringIO()
+        self.write(sudoku, stream)
+        return stream.getvalue()
+
+    def write(self, sudoku: Sudoku, stream: Stream) -> None:
+        newline = self.newline or self.delimiter
+        for i, row in enumerate(sudoku.rows()):
+            if i:
+                stream.write(newline)
+            if self.delimiter:
+                # delimited values are written as numbers, same as `Sudoku.to_string`
+                stream.write(self.delimiter.join([str(c.value or 0) for c in row]))
+            else:
+                stream.write("".join([_CHARS[cell.value or 0] for cell in row]))
+
+
+def export(
+    sudokus: Iterable[Sudoku], stream: Stream, renderer: Renderer, end: str = "\n"
+) -> None:
+    for sudoku in sudokus:
+        renderer.write(sudoku, stream)
+        stream.write(end)
+
+
+class _HtmlFragments(NamedTuple):
+    cells: List[List[Tuple[str, str]]]
+    values: List[str]
+    candidates: List[str]
+    grid: str
+
+
+class HtmlRenderer:
+    def __init__(self, colors: Colors):
+        self.colors = colors
+        self._fragments: Dict[BoxSize, _HtmlFragments] = {}
+
+    def __call__(self, sudoku: Sudoku, step: Optional[Step] = None) -> str:
+        stream = io.StringIO()
+        self.write(sudoku, stream, step)
+        return stream.getvalue()
+
+    def write(
+        self, sudoku: Sudoku, stream: Stream, step: Optional[Step] = None
+    ) -> None:
+        fragments = self.fragments(sudoku.box_size)
+        highlighted = _highlighted(step)
+        stream.write('<table class="sudoku">')
+        for i, row in enumerate(sudoku.rows()):
+            stream.write("<tr>")
+            for j, cell in enumerate(row):
+                stream.write(fragments.cells[i][j][(i, j) in highlighted])
+                if cell.value:
+                    stream.write(fragments.values[cell.value])
+                else:
+                    stream.write(fragments.grid)
+                    for value, candidate in enumerate(fragments.candidates):
+                        if value in cell.candidates:
+                            stream.write(candidate)
+                        elif value:
+                            stream.write("<span></span>")
+                    stream.write("</div>")
+                stream.write("</td>")
+            stream.write("</tr>")
+        stream.write("</table>")
+
+    def fragments(self, box_size: BoxSize) -> _HtmlFragments:
+        if box_size not in self._fragments:
+            self._fragments[box_size] = self._build(box_size)
+        return self._fragments[box_size]
+
+    def _build(self, box_size: BoxSize) -> _HtmlFragments:
+        width, length = box_size
+        size = width * length
+        cells = []
+        for i in range(size):
+            row = []
+            for j in range(size):
+                css = "cell"
+                if i and i % width == 0:
+                    css += " box-top"
+                if j and j % length == 0:
+                    css += " box-left"
+                row.append((f'<td class="{css}">', f'<td class="{css} highlight">'))
+            cells.append(row)
+        values = [self.colors.value(value) for value in range(1, size + 1)]
+        candidates = [
+            f"<span>{self.colors.candidate(value)}</span>"
+            for value in range(1, size + 1)
+        ]
+        return _HtmlFragments(
+            cells=cells,
+            values=[""] + values,
+            candidates=[""] + candidates,
+            grid=(
+                '<div class="candidates" style="display: grid; '
+                f'grid-template-columns: repeat({length}, 1fr)">'
+            ),
+        )
+
+
+class _SvgFragments(NamedTuple):
+    header: str
+    highlights: List[List[str]]
+    values: List[List[str]]
+    candidates: List[List[List[str]]]
+
+
+class SvgRenderer:
+    def __init__(self, colors: Colors, cell_size: int = 40):
+        self.colors = colors
+        self.cell_size = cell_size
+        self._fragments: Dict[BoxSize, _SvgFragments] = {}
+
+    def __call__(self, sudoku: Sudoku, step: Optional[Step] = None) -> str:
+        stream = io.StringIO()
+        self.write(sudoku, stream, step)
+        return stream.getvalue()
+
+    def write(
+        self, sudoku: Sudoku, stream: Stream, step: Optional[Step] = None
+    ) -> None:
+        fragments = self.fragments(sudoku.box_size)
+        stream.write(fragments.header)
+        for i, j in sorted(_highlighted(step)):
+            stream.write(fragments.highlights[i][j])
+        for i, row in enumerate(sudoku.rows()):
+            for j, cell in enumerate(row):
+                if cell.value:
+                    stream.write(fragments.values[i][j])
+                    stream.write(self.colors.value(cell.value))
+                    stream.write("</text>")
+                else:
+                    candidates = fragments.candidates[i][j]
+                    for value in sorted(cell.candidates):
+                        stream.write(candidates[value])
+                        stream.write(self.colors.candidate(value))
+                        stream.write("</text>")
+        stream.write("</svg>")
+
+    def fragments(self, box_size: BoxSize) -> _SvgFragments:
+        if box_size not in self._fragments:
+            self._fragments[box_size] = self._build(box_size)
+        return self._fragments[box_size]
+
+    def _build(self, box_size: BoxSize) -> _SvgFragments:
+        width, length = box_size
+        size = width * length
+        step = self.cell_size
+        total = step * size
+        lines: List[str] = []
+        boxes: List[str] = []
+        for i in range(1, size):
+            path = boxes if i % width == 0 else lines
+            path.append(f"M0 {i * step}H{total}")
+            path = boxes if i % length == 0 else lines
+            path.append(f"M{i * step} 0V{total}")
+        text = 'text-anchor="middle" dominant-baseline="central"'
+        font, small = step * 3 // 5, step * 3 // (5 * max(box_size))
+        return _SvgFragments(
+            header=(
+                '<svg xmlns="http://www.w3.org/2000/svg" class="sudoku" '
+                f'width="{total}" height="{total}" viewBox="0 0 {total} {total}">'
+                f'<rect width="{total}" height="{total}" fill="white"/>'
+                f'<path class="cells" d="{"".join(lines)}" stroke="gray"/>'
+                f'<path class="boxes" d="{"".join(boxes)}" stroke="black" '
+                'stroke-width="2"/>'
+                f'<rect width="{total}" height="{total}" fill="none" stroke="black" '
+                'stroke-width="4"/>'
+            ),
+            highlights=[
+                [
+                    f'<rect class="highlight" x="{j * step}" y="{i * step}" '
+                    f'width="{step}" height="{step}" fill="yellow" '
+                    'fill-opacity="0.5"/>'
+                    for j in range(size)
+                ]
+                for i in range(size)
+            ],
+            values=[
+                [
+                    f'<text class="value" x="{j * step + step // 2}" '
+                    f'y="{i * step + step // 2}" font-size="{font}" {text}>'
+                    for j in range(size)
+                ]
+                for i in range(size)
+            ],
+            candidates=[
+                [
+                    [""]
+                    + [
+                        f'<text class="candidate" '
+                        f'x="{j * step + (v % length * 2 + 1) * step // (2 * length)}" '
+                        f'y="{i * step + (v // length * 2 + 1) * step // (2 * width)}" '
+                        f'font-size="{small}" {text}>'
+                        for v in range(size)
+                    ]
+                    for j in range(size)
+                ]
+                for i in range(size)
+            ],
+        )
+
+
+def _highlighted(step: Optional[Step]) -> Set[Tuple[int, int]]:
+    if step is None:
+        return set()
+    return {cell.position[:2] for cell in step.combination.cells}
+
+
 plain = TermRenderer(
     border=Border(
         Separator("┌", "─", "┬", "╥", "┐"),
@@ -138,3 +418,17 @@ colorful = TermRenderer(
     ),
     colors=Colors(value=TermColor.BOLD, candidate=TermColor.YELLOW),
 )
+
+
+line = TextRenderer()
+
+
+grid = TextRenderer(newline="\n")
+
+
+html = HtmlRenderer(
+    colors=Colors(value=Tag("span", "value"), candidate=Tag("span", "candidate")),
+)
+
+
+svg = SvgRenderer(colors=Colors(value=NoColor(), candidate=NoColor()))
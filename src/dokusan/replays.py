@@ -0,0 +1,167 @@
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from dokusan import caches, exceptions, solvers
+from dokusan.boards import BoxSize, Cell, Sudoku
+from dokusan.caches import Cache
+from dokusan.techniques import Combination, NotFound, Step
+
+# new techniques must be appended to keep ids of stored logs
+TECHNIQUES = (
+    "Bulk Pencil Marking",
+    "Pencil Marking",
+    "Lone Single",
+    "Hidden Single",
+    "Naked Pair",
+    "Hidden Pair",
+    "Naked Triplet",
+    "Hidden Triplet",
+    "Locked Candidate",
+    "Box Line Reduction",
+    "X Wing",
+    "XY Wing",
+    "Swordfish",
+    "Simple Coloring",
+    "Unique Rectangle",
+)
+
+_IDS = {name: i for i, name in enumerate(TECHNIQUES)}
+
+
+def encode(steps: Iterable[Step], box_size: BoxSize) -> bytes:
+    # every step is stored as a flat sequence of numbers:
+    # technique, n, *cells, n, *values, n, *(cell, value, candidates mask)
+    # numbers are little-endian, as wide as the candidates mask of the board
+    size = box_size.width * box_size.length
+    typecode = "H" if size <= 16 else "I" if size <= 32 else "Q"
+    log: List[int] = []
+    for step in steps:
+        combination = step.combination
+        log.append(_IDS[combination.name])
+        log.append(len(combination.cells))
+        log.extend(_index(cell, size) for cell in combination.cells)
+        log.append(len(combination.values))
+        log.extend(combination.values)
+        log.append(len(step.changes))
+        for cell in step.changes:
+            log.append(_index(cell, size))
+            log.append(cell.value or 0)
+            log.append(_mask(cell))
+    return typecode.encode() + struct.pack(f"<{len(log)}{typecode}", *log)
+
+
+def decode(sudoku: Sudoku, log: bytes) -> Iterator[Step]:
+    _sudoku = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    for name, cells, values, changes in _records(log):
+        step = Step(
+            combination=Combination(
+                name=TECHNIQUES[name],
+                cells=[_sudoku[divmod(i, _sudoku.size)] for i in cells],
+                values=list(values),
+            ),
+            changes=_changes(_sudoku, changes),
+        )
+        _sudoku.update(step.changes)
+        yield step
+
+
+def replay(sudoku: Sudoku, log: bytes) -> None:
+    # only the latest change of every cell matters, so all of them go in one update
+    latest: Dict[int, Tuple[int, int, int]] = {}
+    for *_, changes in _records(log):
+        for change in changes:
+            latest[change[0]] = change
+    sudoku.update(_changes(sudoku, list(latest.values())))
+
+
+def steps(sudoku: Sudoku, cache: Cache) -> Iterator[Step]:
+    puzzle = _puzzle(sudoku)
+    for step in decode(puzzle, _log(puzzle, cache)):
+        puzzle.update(step.changes)
+        yield step
+    if not puzzle.is_solved():
+        raise exceptions.Unsolvable
+
+
+def hint(sudoku: Sudoku, cache: Cache, puzzle: Optional[Sudoku] = None) -> Step:
+    # a step from the cached path is valid only if the board is exactly
+    # in the state the path expects, otherwise the hint is computed again
+    state = _puzzle(puzzle or sudoku)
+    cells = list(sudoku.cells())
+    for step in decode(state, _log(state, cache)):
+        if list(state.cells()) == cells:
+            return step
+        state.update(step.changes)
+    for step in solvers.steps(sudoku):
+        return step
+    raise NotFound("Not found")
+
+
+def _puzzle(sudoku: Sudoku) -> Sudoku:
+    return Sudoku(
+        *[Cell.unchecked(cell.position, cell.value) for cell in sudoku.cells()],
+        box_size=sudoku.box_size,
+    )
+
+
+def _log(puzzle: Sudoku, cache: Cache) -> bytes:
+    key = f"path:{caches.key(puzzle)}"
+    log = cache.get(key)
+    if log is None:
+        # techniques may get stuck, then the path is cached up to that point
+        path: List[Step] = []
+        try:
+            for step in solvers.steps(puzzle):
+                path.append(step)
+        except exceptions.Unsolvable:
+            pass
+        log = encode(path, puzzle.box_size)
+        cache.set(key, log)
+    return log
+
+
+def _records(
+    log: bytes,
+) -> Iterator[Tuple[int, List[int], List[int], List[Tuple[int, int, int]]]]:
+    typecode = log[:1].decode()
+    count = (len(log) - 1) // struct.calcsize(f"<{typecode}")
+    numbers = struct.unpack_from(f"<{count}{typecode}", log, 1)
+    i, total = 0, len(numbers)
+    while i < total:
+        name, n = numbers[i], numbers[i + 1]
+        cells = list(numbers[i + 2 : i + 2 + n])
+        i += 2 + n
+        n = numbers[i]
+        values = list(numbers[i + 1 : i + 1 + n])
+        i += 1 + n
+        n = numbers[i]
+        flat = list(numbers[i + 1 : i + 1 + 3 * n])
+        i += 1 + 3 * n
+        yield name, cells, values, list(zip(flat[::3], flat[1::3], flat[2::3]))
+
+
+def _changes(sudoku: Sudoku, changes: List[Tuple[int, int, int]]) -> List[Cell]:
+    size = sudoku.size
+    return [
+        Cell.unchecked(
+            sudoku[divmod(i, size)].position,
+            value=value or None,
+            candidates=_candidates(mask),
+        )
+        for i, value, mask in changes
+    ]
+
+
+def _index(cell: Cell, size: int) -> int:
+    return cell.position.row * size + cell.position.column
+
+
+def _mask(cell: Cell) -> int:
+    mask = 0
+    for value in cell.candidates:
+        mask |= 1 << value - 1
+    return mask
+
+
+def _candidates(mask: int) -> Set[int]:
+    return {value for value in range(1, mask.bit_length() + 1) if mask >> value - 1 & 1}
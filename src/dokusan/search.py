@@ -0,0 +1,485 @@
+import contextlib
+import dataclasses
+import functools
+import operator
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from dokusan import exceptions, techniques
+from dokusan.boards import BoxSize, Cell, Position, Sudoku
+from dokusan.techniques import Technique
+
+
+@dataclass
+class SearchStats:
+    nodes: int = 0
+    backtracks: int = 0
+    max_depth: int = 0
+    propagations: int = 0
+    elapsed: float = 0.0
+    technique_time: Dict[str, float] = field(default_factory=dict)
+    technique_steps: Dict[str, int] = field(default_factory=dict)
+
+    def visit(self, depth: int) -> None:
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def record(self, technique: Type[Technique], elapsed: float, steps: int) -> None:
+        name = technique.__name__
+        self.technique_time[name] = self.technique_time.get(name, 0.0) + elapsed
+        self.technique_steps[name] = self.technique_steps.get(name, 0) + steps
+
+
+T = TypeVar("T")
+
+Update = Callable[[List[Cell]], None]
+Propagate = Callable[[Sudoku, Update, Optional[SearchStats]], None]
+
+
+class Budget:
+    def __init__(
+        self, max_nodes: Optional[int] = None, max_seconds: Optional[float] = None
+    ):
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.stats = SearchStats()
+        self.cancelled = False
+        self._started: Optional[float] = None
+        self._shared = False
+
+    def start(self) -> None:
+        # limits apply to every search on its own, cancellation stays
+        if self._shared:
+            return
+        self.stats = SearchStats()
+        self._started = None
+
+    @contextlib.contextmanager
+    def shared(self) -> Iterator["Budget"]:
+        # searches inside spend from the same limits, started on enter
+        self.start()
+        self._started = time.monotonic()
+        self._shared = True
+        try:
+            yield self
+        finally:
+            self._shared = False
+
+    def cancel(self) -> None:
+        # may be called from another thread, search stops at its next node
+        self.cancelled = True
+
+    def spend(self, depth: int) -> None:
+        if self.cancelled:
+            raise exceptions.Cancelled("Search cancelled")
+
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+
+        stats = self.stats
+        stats.visit(depth)
+        stats.elapsed = now - self._started
+
+        if self.max_nodes is not None and stats.nodes > self.max_nodes:
+            raise exceptions.BudgetExceeded(
+                f"Exceeded {self.max_nodes} nodes", dataclasses.replace(stats)
+            )
+        if self.max_seconds is not None and stats.elapsed > self.max_seconds:
+            raise exceptions.BudgetExceeded(
+                f"Exceeded {self.max_seconds} seconds", dataclasses.replace(stats)
+            )
+
+
+class Solution(NamedTuple):
+    sudoku: Sudoku
+    branch_factor: int
+    depth: int
+
+
+def complete(task: Generator[None, None, T]) -> T:
+    while True:
+        try:
+            next(task)
+        except StopIteration as exc:
+            return exc.value
+
+
+class Branching(ABC):
+    @abstractmethod
+    def select(self, sudoku: Sudoku) -> Optional[Cell]:
+        ...
+
+    def order(self, sudoku: Sudoku, cell: Cell) -> Iterable[int]:
+        return tuple(cell.candidates)
+
+
+class SortedCandidates(Branching):
+    def select(self, sudoku: Sudoku) -> Optional[Cell]:
+        cells = sorted(
+            (cell for cell in sudoku.cells() if not cell.value),
+            key=operator.attrgetter("candidates"),
+        )
+        return cells[0] if cells else None
+
+
+class MinimumRemainingValues(Branching):
+    def __init__(self, degree: bool = False, least_constraining: bool = False):
+        self.degree = degree
+        self.least_constraining = least_constraining
+
+    def select(self, sudoku: Sudoku) -> Optional[Cell]:
+        fewest = 0
+        cells: List[Cell] = []
+        for cell in sudoku.cells():
+            if cell.value:
+                continue
+            remaining = len(cell.candidates)
+            if remaining < 2:
+                return cell
+            if not cells or remaining < fewest:
+                fewest, cells = remaining, [cell]
+            elif remaining == fewest:
+                cells.append(cell)
+
+        if not cells:
+            return None
+        if self.degree and len(cells) > 1:
+            return max(cells, key=lambda cell: self._degree(sudoku, cell))
+        return cells[0]
+
+    def order(self, sudoku: Sudoku, cell: Cell) -> Iterable[int]:
+        if not self.least_constraining:
+            return tuple(cell.candidates)
+        peers = [peer for peer in sudoku.intersection(cell) if peer.candidates]
+        return sorted(
+            cell.candidates,
+            key=lambda value: sum(value in peer.candidates for peer in peers),
+        )
+
+    def _degree(self, sudoku: Sudoku, cell: Cell) -> int:
+        return sum(1 for peer in sudoku.intersection(cell) if not peer.value)
+
+
+class _Frame(NamedTuple):
+    mark: int
+    cell: Cell
+    candidates: Iterator[int]
+
+
+def propagate(
+    sudoku: Sudoku, update: Update, stats: Optional[SearchStats] = None
+) -> None:
+    _apply(techniques.BulkPencilMarking, sudoku, update, stats)
+    propagate_singles(sudoku, update, stats)
+
+
+def propagate_singles(
+    sudoku: Sudoku, update: Update, stats: Optional[SearchStats] = None
+) -> None:
+    all_techniques = (
+        techniques.LoneSingle,
+        techniques.HiddenSingle,
+    )
+
+    has_result = True
+    while has_result:
+        if stats is not None:
+            stats.propagations += 1
+        for technique in all_techniques:
+            has_result = _apply(technique, sudoku, update, stats)
+
+
+def _apply(
+    technique: Type[Technique],
+    sudoku: Sudoku,
+    update: Update,
+    stats: Optional[SearchStats] = None,
+) -> bool:
+    if stats is None:
+        has_result = False
+        for step in technique(sudoku):
+            update(step.changes)
+            has_result = True
+        return has_result
+
+    started = time.perf_counter()
+    count = 0
+    for step in technique(sudoku):
+        update(step.changes)
+        count += 1
+    stats.record(technique, time.perf_counter() - started, count)
+    return count > 0
+
+
+def search(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    propagate: Propagate = propagate,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+) -> Iterator[Solution]:
+    for solution in cooperative_search(sudoku, budget, propagate, branching, stats):
+        if solution is not None:
+            yield solution
+
+
+def cooperative_search(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    propagate: Propagate = propagate,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+    every: Optional[int] = None,
+) -> Iterator[Optional[Solution]]:
+    # yields None every `every` nodes to give control back to the caller
+    if branching is None:
+        branching = MinimumRemainingValues()
+    if budget is not None:
+        budget.start()
+
+    _sudoku = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    stack: List[_Frame] = []
+    depth, branch_factor = 0, 1
+    started = time.perf_counter()
+    nodes = 0
+
+    while True:
+        if budget is not None:
+            budget.spend(depth)
+        if stats is not None:
+            stats.visit(depth)
+        nodes += 1
+        if every is not None and nodes % every == 0:
+            yield None
+
+        propagate(_sudoku, _sudoku.update, stats)
+        cell = branching.select(_sudoku)
+        if cell is None:
+            yield Solution(
+                sudoku=Sudoku(*_sudoku.cells(), box_size=_sudoku.box_size),
+                branch_factor=branch_factor,
+                depth=depth,
+            )
+        else:
+            candidates = iter(branching.order(_sudoku, cell))
+            stack.append(_Frame(_sudoku.mark(), cell, candidates))
+
+        candidate, frame = _next_candidate(stack, _sudoku, stats)
+        if stats is not None:
+            stats.elapsed = time.perf_counter() - started
+        if frame is None:
+            return
+
+        _sudoku.update([Cell.unchecked(frame.cell.position, value=candidate)])
+        depth, branch_factor = len(stack), len(frame.cell.candidates)
+
+
+def _next_candidate(
+    stack: List[_Frame], sudoku: Sudoku, stats: Optional[SearchStats]
+) -> Tuple[Optional[int], Optional[_Frame]]:
+    while stack:
+        frame = stack[-1]
+        if stats is not None and sudoku.mark() > frame.mark:
+            stats.backtracks += 1
+        sudoku.undo_to(frame.mark)
+        for candidate in frame.candidates:
+            return candidate, frame
+        stack.pop()
+    return None, None
+
+
+class _BitFrame(NamedTuple):
+    values: List[int]
+    masks: List[int]
+    depth: int
+    branch_factor: int
+
+
+def bitmask_search(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    stats: Optional[SearchStats] = None,
+) -> Iterator[Solution]:
+    for solution in cooperative_bitmask_search(sudoku, budget, stats):
+        if solution is not None:
+            yield solution
+
+
+def cooperative_bitmask_search(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    stats: Optional[SearchStats] = None,
+    every: Optional[int] = None,
+) -> Iterator[Optional[Solution]]:
+    if budget is not None:
+        budget.start()
+    units, peers = _bit_layout(sudoku.box_size)
+    size = sudoku.size
+    values = [0] * size * size
+    masks = [(1 << size) - 1] * size * size
+    for cell in sudoku.cells():
+        i = cell.position.row * size + cell.position.column
+        if cell.value and not _assign(values, masks, peers, i, cell.value):
+            return
+
+    stack = [_BitFrame(values, masks, depth=0, branch_factor=1)]
+    started = time.perf_counter()
+    nodes = 0
+
+    while stack:
+        values, masks, depth, branch_factor = stack.pop()
+        if budget is not None:
+            budget.spend(depth)
+        if stats is not None:
+            stats.visit(depth)
+            stats.elapsed = time.perf_counter() - started
+        nodes += 1
+        if every is not None and nodes % every == 0:
+            yield None
+
+        if not _bit_propagate(values, masks, units, peers, stats):
+            if stats is not None:
+                stats.backtracks += 1
+            continue
+
+        index = _bit_select(values, masks)
+        if index is None:
+            yield Solution(
+                sudoku=_to_sudoku(values, sudoku.box_size),
+                branch_factor=branch_factor,
+                depth=depth,
+            )
+            continue
+
+        candidates = _bit_values(masks[index])
+        for value in reversed(candidates):
+            _values, _masks = values[:], masks[:]
+            if _assign(_values, _masks, peers, index, value):
+                stack.append(_BitFrame(_values, _masks, depth + 1, len(candidates)))
+
+
+@functools.lru_cache(maxsize=None)
+def _bit_layout(box_size: BoxSize) -> Tuple[List[List[int]], List[Tuple[int, ...]]]:
+    size = box_size.width * box_size.length
+    units = [
+        [cell.position.row * size + cell.position.column for cell in group]
+        for group in Sudoku(box_size=box_size).groups()
+    ]
+    peers: List[Set[int]] = [set() for _ in range(size * size)]
+    for unit in units:
+        for index in unit:
+            peers[index].update(unit)
+    return units, [tuple(sorted(p - {i})) for i, p in enumerate(peers)]
+
+
+def _assign(
+    values: List[int],
+    masks: List[int],
+    peers: List[Tuple[int, ...]],
+    index: int,
+    value: int,
+) -> bool:
+    bit = 1 << (value - 1)
+    if not masks[index] & bit:
+        return False
+    values[index], masks[index] = value, 0
+    for peer in peers[index]:
+        if masks[peer] & bit:
+            masks[peer] ^= bit
+            if not masks[peer]:
+                return False
+    return True
+
+
+def _bit_propagate(
+    values: List[int],
+    masks: List[int],
+    units: List[List[int]],
+    peers: List[Tuple[int, ...]],
+    stats: Optional[SearchStats],
+) -> bool:
+    full = (1 << len(units[0])) - 1
+    has_result = True
+    while has_result:
+        if stats is not None:
+            stats.propagations += 1
+        has_result = False
+
+        for index, mask in enumerate(masks):
+            if mask and not mask & (mask - 1):
+                if not _assign(values, masks, peers, index, mask.bit_length()):
+                    return False
+                has_result = True
+
+        for unit in units:
+            once = twice = placed = 0
+            for index in unit:
+                if values[index]:
+                    placed |= 1 << (values[index] - 1)
+                else:
+                    twice |= once & masks[index]
+                    once |= masks[index]
+            if once | placed != full:
+                return False
+
+            hidden = once & ~twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for index in unit:
+                    if masks[index] & bit:
+                        value = bit.bit_length()
+                        if not _assign(values, masks, peers, index, value):
+                            return False
+                        break
+                else:
+                    return False
+                has_result = True
+    return True
+
+
+def _bit_select(values: List[int], masks: List[int]) -> Optional[int]:
+    selected, fewest = None, len(masks) + 1
+    for index, mask in enumerate(masks):
+        if not values[index]:
+            count = bin(mask).count("1")
+            if count < fewest:
+                selected, fewest = index, count
+                if count <= 2:
+                    break
+    return selected
+
+
+def _bit_values(mask: int) -> List[int]:
+    return [value for value in range(1, mask.bit_length() + 1) if mask >> value - 1 & 1]
+
+
+def _to_sudoku(values: List[int], box_size: BoxSize) -> Sudoku:
+    size = box_size.width * box_size.length
+    return Sudoku(
+        *[
+            Cell.unchecked(
+                Position(i, j, box_size.sequential(i, j)), value=values[i * size + j]
+            )
+            for i in range(size)
+            for j in range(size)
+        ],
+        box_size=box_size,
+    )
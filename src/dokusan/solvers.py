@@ -1,80 +1,360 @@
-import operator
-from typing import Iterator, Tuple, Type
+import itertools
+import time
+from typing import (
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
-from dokusan import exceptions, techniques
+from dokusan import caches, exceptions, search
 from dokusan.boards import Cell, Sudoku
-from dokusan.techniques import Step, Technique
+from dokusan.caches import Cache
+from dokusan.search import Branching, Budget, SearchStats
+from dokusan.techniques import (
+    BoxLineReduction,
+    BulkPencilMarking,
+    HiddenPair,
+    HiddenSingle,
+    HiddenTriplet,
+    LockedCandidate,
+    LoneSingle,
+    Metrics,
+    NakedPair,
+    NakedTriplet,
+    SimpleColoring,
+    Step,
+    Swordfish,
+    Technique,
+    UniqueRectangle,
+    XWing,
+    XYWing,
+)
 
+TECHNIQUES: Tuple[Type[Technique], ...] = (
+    LoneSingle,
+    HiddenSingle,
+    NakedPair,
+    HiddenPair,
+    NakedTriplet,
+    HiddenTriplet,
+    LockedCandidate,
+    BoxLineReduction,
+    XWing,
+    XYWing,
+    Swordfish,
+    SimpleColoring,
+    UniqueRectangle,
+)
 
-def eliminate(sudoku: Sudoku) -> Sudoku:
+LARGE_BOARD_SIZE = 16
+
+CHEAP_TECHNIQUES: Tuple[Type[Technique], ...] = (
+    NakedPair,
+    HiddenPair,
+    LockedCandidate,
+    BoxLineReduction,
+)
+
+
+def eliminate(sudoku: Sudoku, stats: Optional[SearchStats] = None) -> Sudoku:
     _sudoku = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    search.propagate(_sudoku, _sudoku.update, stats)
+    return _sudoku
+
+
+def backtrack(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+    cache: Optional[Cache] = None,
+) -> Sudoku:
+    # other branching may find other solution, so only default one is cached
+    if cache is None or branching is not None:
+        return _backtrack(sudoku, budget, branching, stats)
 
-    all_techniques = (
-        techniques.LoneSingle,
-        techniques.HiddenSingle,
+    # same cache may keep solve paths too, see `replays`
+    key = f"solution:{caches.key(sudoku)}"
+    values = cache.get(key)
+    if values is None:
+        solution = _backtrack(sudoku, budget, branching, stats)
+        cache.set(key, bytes(cell.value or 0 for cell in solution.cells()))
+        return solution
+
+    size = sudoku.size
+    return Sudoku.from_list(
+        [list(values[i * size : i * size + size]) for i in range(size)],
+        box_size=sudoku.box_size,
+    )
+
+
+def _backtrack(
+    sudoku: Sudoku,
+    budget: Optional[Budget],
+    branching: Optional[Branching],
+    stats: Optional[SearchStats],
+) -> Sudoku:
+    return search.complete(
+        cooperative_backtrack(sudoku, budget, branching, stats, every=None)
     )
 
-    for step in techniques.BulkPencilMarking(_sudoku):
-        _sudoku.update(step.changes)
 
-    has_result = True
-    while has_result:
-        for technique in all_techniques:
+def cooperative_backtrack(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+    every: Optional[int] = 1000,
+) -> Generator[None, None, Sudoku]:
+    # yields every `every` nodes, the solution is the return value
+    solutions: Iterator[Optional[search.Solution]]
+    if branching is None and sudoku.size >= LARGE_BOARD_SIZE:
+        solutions = search.cooperative_bitmask_search(
+            sudoku, budget=budget, stats=stats, every=every
+        )
+    else:
+        solutions = search.cooperative_search(
+            sudoku, budget=budget, branching=branching, stats=stats, every=every
+        )
+    for solution in solutions:
+        if solution is not None:
+            return solution.sudoku
+        yield
+    raise exceptions.NoCandidates
+
+
+class HybridPropagation:
+    def __init__(
+        self,
+        techniques: Sequence[Type[Technique]] = CHEAP_TECHNIQUES,
+        warmup: int = 8,
+        probe: int = 16,
+    ):
+        self.techniques = tuple(techniques)
+        self.warmup = warmup
+        self.probe = probe
+        self.metrics: Dict[Tuple[Type[Technique], int], Metrics] = {}
+        self.skipped: Dict[Tuple[Type[Technique], int], int] = {}
+        self.node_time = 0.0
+        self.nodes = 0
+
+    def __call__(
+        self,
+        sudoku: Sudoku,
+        update: search.Update,
+        stats: Optional[SearchStats] = None,
+    ) -> None:
+        started = time.perf_counter()
+        update(_narrow(sudoku))
+        search.propagate_singles(sudoku, update, stats)
+        self.node_time += time.perf_counter() - started
+        self.nodes += 1
+
+        level = self._level(sudoku)
+        has_result = True
+        while has_result:
             has_result = False
-            for step in technique(_sudoku):
-                _sudoku.update(step.changes)
-                has_result = True
-    return _sudoku
+            for technique in self.techniques:
+                if self._is_worth(technique, level):
+                    has_result = self._apply(technique, level, sudoku, update, stats)
+                    if has_result:
+                        search.propagate_singles(sudoku, update, stats)
+                        break
 
+    def _apply(
+        self,
+        technique: Type[Technique],
+        level: int,
+        sudoku: Sudoku,
+        update: search.Update,
+        stats: Optional[SearchStats],
+    ) -> bool:
+        started = time.perf_counter()
+        found = _independent(technique(sudoku), bulk=True)
+        for step in found:
+            update(step.changes)
+        elapsed = time.perf_counter() - started
 
-def backtrack(sudoku: Sudoku) -> Sudoku:
-    _sudoku = eliminate(sudoku)
+        metrics = self.metrics.setdefault((technique, level), Metrics())
+        metrics.invocations += 1
+        metrics.hits += bool(found)
+        metrics.time += elapsed
+        if stats is not None:
+            stats.record(technique, elapsed, len(found))
+        return bool(found)
 
-    cells = sorted(
-        (cell for cell in _sudoku.cells() if not cell.value),
-        key=operator.attrgetter("candidates"),
-    )
+    def _is_worth(self, technique: Type[Technique], level: int) -> bool:
+        key = (technique, level)
+        metrics = self.metrics.get(key)
+        if metrics is None or metrics.invocations < self.warmup:
+            return True
+        # a hit is expected to save at least one search node
+        saved = metrics.hits * self.node_time / self.nodes
+        if saved >= metrics.time:
+            return True
+        self.skipped[key] = self.skipped.get(key, 0) + 1
+        return self.skipped[key] % self.probe == 0
 
-    for cell in cells:
-        for candidate in cell.candidates:
-            _sudoku.update([Cell(position=cell.position, value=candidate)])
-            try:
-                return backtrack(_sudoku)
-            except (exceptions.InvalidSudoku, exceptions.NoCandidates):
-                pass
-            _sudoku.update([cell])
-        else:
-            raise exceptions.NoCandidates
+    def _level(self, sudoku: Sudoku) -> int:
+        empty = sum(1 for cell in sudoku.cells() if not cell.value)
+        return empty // sudoku.size
 
-    return _sudoku
 
+def hybrid(
+    sudoku: Sudoku,
+    techniques: Union[Sequence[Type[Technique]], HybridPropagation] = CHEAP_TECHNIQUES,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+) -> Sudoku:
+    if isinstance(techniques, HybridPropagation):
+        propagation = techniques
+    else:
+        propagation = HybridPropagation(techniques)
 
-def steps(sudoku: Sudoku) -> Iterator[Step]:
     _sudoku = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
-
-    all_techniques: Tuple[Type[Technique], ...] = (
-        techniques.LoneSingle,
-        techniques.HiddenSingle,
-        techniques.NakedPair,
-        techniques.NakedTriplet,
-        techniques.LockedCandidate,
-        techniques.XYWing,
-        techniques.UniqueRectangle,
+    for step in BulkPencilMarking(_sudoku):
+        _sudoku.update(step.changes)
+    solutions = search.search(
+        _sudoku,
+        budget=budget,
+        propagate=propagation,
+        branching=branching,
+        stats=stats,
     )
+    for solution in solutions:
+        return solution.sudoku
+    raise exceptions.NoCandidates
+
+
+class AdaptiveOrder:
+    def __init__(
+        self,
+        techniques: Sequence[Type[Technique]] = TECHNIQUES,
+        warmup: int = 50,
+    ):
+        self.techniques = tuple(techniques)
+        self.warmup = warmup
+        self.metrics = {technique: Metrics() for technique in self.techniques}
+
+    def __iter__(self) -> Iterator[Type[Technique]]:
+        ordered = sorted(
+            (t for t in self.techniques if not self._is_skipped(t)), key=self._cost
+        )
+        skipped = (t for t in self.techniques if self._is_skipped(t))
+        return itertools.chain(ordered, skipped)
+
+    def record(self, technique: Type[Technique], elapsed: float, hit: bool) -> None:
+        metrics = self.metrics.setdefault(technique, Metrics())
+        metrics.invocations += 1
+        metrics.hits += hit
+        metrics.time += elapsed
+
+    def _cost(self, technique: Type[Technique]) -> Tuple[bool, float, int]:
+        metrics = self.metrics[technique]
+        if metrics.invocations < self.warmup:
+            return False, 0.0, self.techniques.index(technique)
+        cost = metrics.time / metrics.hits
+        return True, cost, self.techniques.index(technique)
+
+    def _is_skipped(self, technique: Type[Technique]) -> bool:
+        metrics = self.metrics[technique]
+        return metrics.invocations >= self.warmup and not metrics.hits
+
+
+def steps(
+    sudoku: Sudoku,
+    techniques: Iterable[Type[Technique]] = TECHNIQUES,
+    bulk: bool = False,
+    stats: Optional[SearchStats] = None,
+) -> Iterator[Step]:
+    _sudoku = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    adaptive = techniques if isinstance(techniques, AdaptiveOrder) else None
+    if adaptive is None:
+        # techniques are tried again on every pass, an iterator would run out
+        techniques = tuple(techniques)
 
-    for step in techniques.BulkPencilMarking(_sudoku):
+    for step in _find_steps(BulkPencilMarking, _sudoku, False, stats):
         _sudoku.update(step.changes)
         yield step
 
     while not _sudoku.is_solved():
-        for technique in all_techniques:
-            try:
-                step = technique(_sudoku).first()
-            except techniques.NotFound:
-                continue
-            else:
+        for technique in techniques:
+            found = _find_steps(technique, _sudoku, bulk, stats, adaptive)
+            for step in found:
                 _sudoku.update(step.changes)
                 yield step
+            if found:
                 break
         else:
             raise exceptions.Unsolvable
+
+
+def _find_steps(
+    technique: Type[Technique],
+    sudoku: Sudoku,
+    bulk: bool,
+    stats: Optional[SearchStats],
+    adaptive: Optional[AdaptiveOrder] = None,
+) -> List[Step]:
+    if stats is None and adaptive is None:
+        return _independent(technique(sudoku), bulk)
+
+    started = time.perf_counter()
+    found = _independent(technique(sudoku), bulk)
+    elapsed = time.perf_counter() - started
+    if stats is not None:
+        stats.record(technique, elapsed, len(found))
+    if adaptive is not None:
+        adaptive.record(technique, elapsed, bool(found))
+    return found
+
+
+def _narrow(sudoku: Sudoku) -> List[Cell]:
+    # unlike pencil marking, keeps candidates eliminated by other techniques
+    changes = []
+    for cell in sudoku.cells():
+        if cell.candidates:
+            values = {peer.value for peer in sudoku.intersection(cell) if peer.value}
+            if cell.candidates & values:
+                candidates = cell.candidates - values
+                changes.append(Cell.unchecked(cell.position, candidates=candidates))
+    return changes
+
+
+def _independent(steps: Iterable[Step], bulk: bool) -> List[Step]:
+    if not bulk:
+        return list(itertools.islice(steps, 1))
+
+    result = []
+    changed: Dict[Tuple[int, int], Cell] = {}
+    for step in steps:
+        changes = [
+            merged
+            for cell in step.changes
+            if (merged := _merge(changed.get(cell.position[:2]), cell)) is not None
+        ]
+        if changes:
+            changed.update((cell.position[:2], cell) for cell in changes)
+            result.append(Step(combination=step.combination, changes=changes))
+    return result
+
+
+def _merge(previous: Optional[Cell], cell: Cell) -> Optional[Cell]:
+    if previous is None:
+        return cell
+    if previous.value:
+        return None
+    if cell.value:
+        return cell
+    candidates = previous.candidates & cell.candidates
+    if candidates == previous.candidates:
+        return None
+    return Cell.unchecked(cell.position, candidates=candidates)
@@ -1,43 +1,151 @@
-import operator
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Generator, Iterable, Iterator, Optional, Tuple, Union
 
-from dokusan import exceptions, solvers
-from dokusan.boards import Cell, Sudoku
+from dokusan import exceptions, search, solvers
+from dokusan.boards import Sudoku
+from dokusan.search import Branching, Budget, SearchStats, SortedCandidates
 
+DIFFICULTY = {
+    "Bulk Pencil Marking": 0,
+    "Pencil Marking": 0,
+    "Lone Single": 1,
+    "Hidden Single": 2,
+    "Naked Pair": 3,
+    "Hidden Pair": 4,
+    "Naked Triplet": 5,
+    "Hidden Triplet": 6,
+    "Locked Candidate": 7,
+    "Box Line Reduction": 8,
+    "X Wing": 9,
+    "XY Wing": 10,
+    "Swordfish": 11,
+    "Simple Coloring": 12,
+    "Unique Rectangle": 13,
+}
+
+SEARCH = "Search"
+
+
+@dataclass
+class Rating:
+    score: int = 0
+    hardest: Optional[str] = None
+    techniques: Dict[str, int] = field(default_factory=dict)
+    solved: bool = True
+
+
+def rate(sudoku: Sudoku) -> Rating:
+    counter: Counter = Counter()
+    solved = True
+    try:
+        for step in solvers.steps(sudoku):
+            counter[step.combination.name] += 1
+    except exceptions.Unsolvable:
+        solved = False
+
+    difficulty = {name: _difficulty(name) for name in counter}
+    if not solved:
+        # the rest needs search, which is harder than any technique
+        difficulty[SEARCH] = max(DIFFICULTY.values()) + 1
+    hardest = max(difficulty, key=difficulty.__getitem__, default=None)
+
+    return Rating(
+        score=(
+            max(difficulty.values(), default=0) * 100
+            + sum(difficulty[name] * count for name, count in counter.items())
+        ),
+        hardest=hardest if hardest and difficulty[hardest] else None,
+        techniques=dict(counter),
+        solved=solved,
+    )
+
+
+def _difficulty(name: str) -> int:
+    return DIFFICULTY.get(name, max(DIFFICULTY.values()) + 1)
+
+
+def rank(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+) -> int:
+    return search.complete(
+        cooperative_rank(sudoku, budget, branching, stats, every=None)
+    )
+
+
+def cooperative_rank(
+    sudoku: Sudoku,
+    budget: Optional[Budget] = None,
+    branching: Optional[Branching] = None,
+    stats: Optional[SearchStats] = None,
+    every: Optional[int] = 1000,
+) -> Generator[None, None, int]:
+    # yields every `every` nodes, the rank is the return value
+    if branching is None:
+        # rank values are calibrated against this branching order
+        branching = SortedCandidates()
 
-def rank(sudoku: Sudoku) -> int:
     total_solutions = 0
     total_branch_factor = 0
 
-    def count(sudoku: Sudoku) -> None:
-        nonlocal total_solutions
-        nonlocal total_branch_factor
-        _sudoku = solvers.eliminate(sudoku)
-
-        cells = sorted(
-            (cell for cell in _sudoku.cells() if not cell.value),
-            key=operator.attrgetter("candidates"),
-        )
-
-        for cell in cells:
-            branch_factor = len(cell.candidates)
-            for candidate in cell.candidates:
-                _sudoku.update([Cell(position=cell.position, value=candidate)])
-                try:
-                    count(_sudoku)
-                except (exceptions.InvalidSudoku, exceptions.NoCandidates):
-                    pass
-                else:
-                    total_solutions += 1
-                    if total_solutions > 1:
-                        raise exceptions.MultipleSolutions
-                    total_branch_factor += pow(branch_factor - 1, 2)
-                _sudoku.update([cell])
-            else:
-                raise exceptions.NoCandidates
+    solutions = search.cooperative_search(
+        sudoku, budget=budget, branching=branching, stats=stats, every=every
+    )
+    for solution in solutions:
+        if solution is None:
+            yield
+            continue
+        total_solutions += 1
+        if total_solutions > 1:
+            raise exceptions.MultipleSolutions
+        total_branch_factor += pow(solution.branch_factor - 1, 2)
 
-    try:
-        count(sudoku)
-    except exceptions.NoCandidates:
-        pass
+    if not total_solutions:
+        raise exceptions.Unsolvable
 
     return (total_branch_factor * 100) + sum(1 for c in sudoku.cells() if not c.value)
+
+
+def rank_many(
+    puzzles: Iterable[Sudoku],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[int, Union[int, exceptions.DokusanError]]]:
+    executor = ProcessPoolExecutor(max_workers=workers)
+    # puzzles are submitted lazily, keeping every worker busy
+    window = 2 * (workers or os.cpu_count() or 1)
+    pending: Dict[Future, int] = {}
+    try:
+        for i, sudoku in enumerate(puzzles):
+            pending[executor.submit(_rank_or_error, sudoku, timeout)] = i
+            if len(pending) >= window:
+                yield from _completed(pending)
+        while pending:
+            yield from _completed(pending)
+    finally:
+        # consumer may stop early, puzzles that haven't started are dropped
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _completed(
+    pending: Dict[Future, int]
+) -> Iterator[Tuple[int, Union[int, exceptions.DokusanError]]]:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        yield pending.pop(future), future.result()
+
+
+def _rank_or_error(
+    sudoku: Sudoku, timeout: Optional[float]
+) -> Union[int, exceptions.DokusanError]:
+    try:
+        return rank(sudoku, budget=Budget(max_seconds=timeout))
+    except exceptions.DokusanError as exc:
+        return exc
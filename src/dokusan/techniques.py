@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import dataclasses
 import itertools
 import operator
+import time
 from abc import ABC, abstractmethod
 from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
-
-from dokusan.boards import Cell, Sudoku
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
+
+from dokusan.boards import Cell, Position, Sudoku
 
 
 class NotFound(Exception):
@@ -16,12 +30,16 @@ class NotFound(Exception):
 
 @dataclass
 class Step:
+    __slots__ = ("combination", "changes")
+
     combination: Combination
     changes: List[Cell]
 
 
 @dataclass
 class Combination:
+    __slots__ = ("name", "cells", "values")
+
     name: str
     cells: List[Cell]
     values: List[int]
@@ -32,23 +50,58 @@ class Combination:
         return f"{self.name}: `{', '.join(values)}` at {', '.join(positions)}"
 
 
+@dataclass
+class Metrics:
+    invocations: int = 0
+    hits: int = 0
+    time: float = 0.0
+    cells_scanned: int = 0
+
+
 class Technique(ABC):
+    collect_metrics: ClassVar[bool] = False
+    _metrics: ClassVar[Dict[str, Metrics]] = {}
+
     def __init__(self, sudoku: Sudoku):
         self.sudoku = sudoku
 
     def __iter__(self) -> Iterator[Step]:
+        if Technique.collect_metrics:
+            return self._measure()
         return (
             Step(combination=combination, changes=changes)
             for combination in self._find()
             if (changes := self._get_changes(combination))
         )
 
+    @classmethod
+    def metrics(cls) -> Metrics:
+        return Technique._metrics.setdefault(cls.__name__, Metrics())
+
     def first(self) -> Step:
         try:
             return next(iter(self))
         except StopIteration:
             raise NotFound("Not found")
 
+    def _measure(self) -> Iterator[Step]:
+        metrics = self.metrics()
+        metrics.invocations += 1
+        # the board is counted only while this pass runs, then restored
+        sudoku = self.sudoku
+        self.sudoku = cast(Sudoku, _Scan(sudoku, metrics))
+        try:
+            started = time.perf_counter()
+            for combination in self._find():
+                if changes := self._get_changes(combination):
+                    metrics.hits += 1
+                    metrics.time += time.perf_counter() - started
+                    yield Step(combination=combination, changes=changes)
+                    started = time.perf_counter()
+            metrics.time += time.perf_counter() - started
+        finally:
+            self.sudoku = sudoku
+
     @abstractmethod
     def _find(self) -> Iterator[Combination]:
         ...
@@ -58,6 +111,59 @@ class Technique(ABC):
         ...
 
 
+class _Scan:
+    # counts every cell the technique reads from the board or compares with it
+    def __init__(self, sudoku: Sudoku, metrics: Metrics):
+        self._sudoku = sudoku
+        self._metrics = metrics
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sudoku, name)
+
+    def __getitem__(self, key: Tuple[int, int]) -> Cell:
+        self._metrics.cells_scanned += 1
+        return self._sudoku[key]
+
+    def cells(self) -> Iterator[Cell]:
+        for cell in self._sudoku.cells():
+            self._metrics.cells_scanned += 1
+            yield cell
+
+    def rows(self) -> Iterator[Sequence[Cell]]:
+        return self._groups(self._sudoku.rows())
+
+    def columns(self) -> Iterator[Sequence[Cell]]:
+        return self._groups(self._sudoku.columns())
+
+    def boxes(self) -> Iterator[Sequence[Cell]]:
+        return self._groups(self._sudoku.boxes())
+
+    def groups(self) -> Iterator[Sequence[Cell]]:
+        return self._groups(self._sudoku.groups())
+
+    def is_intersects(self, cell_a: Cell, cell_b: Cell) -> bool:
+        self._metrics.cells_scanned += 2
+        return self._sudoku.is_intersects(cell_a, cell_b)
+
+    def intersection(self, *cells: Cell) -> List[Cell]:
+        result = self._sudoku.intersection(*cells)
+        self._metrics.cells_scanned += len(result)
+        return result
+
+    def _groups(self, groups: Iterable[Sequence[Cell]]) -> Iterator[Sequence[Cell]]:
+        for group in groups:
+            self._metrics.cells_scanned += len(group)
+            yield group
+
+
+def metrics() -> Dict[str, Metrics]:
+    return {name: dataclasses.replace(m) for name, m in Technique._metrics.items()}
+
+
+def reset_metrics() -> None:
+    Technique._metrics.clear()
+
+
 class PencilMarking(Technique):
     def _find(self) -> Iterator[Combination]:
         for cell in self.sudoku.cells():
@@ -73,7 +179,7 @@ class PencilMarking(Technique):
         for cell in combination.cells:
             candidates = self._get_candidates(cell)
             if not cell.candidates or cell.candidates - candidates:
-                result.append(Cell(position=cell.position, candidates=candidates))
+                result.append(Cell.unchecked(cell.position, candidates=candidates))
         return result
 
     def _get_candidates(self, cell: Cell) -> Set[int]:
@@ -103,12 +209,12 @@ class LoneSingle(Technique):
 
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
-        single = Cell(
+        single = Cell.unchecked(
             position=combination.cells[0].position,
             value=combination.values[0],
         )
         return [
-            Cell(position=cell.position, candidates=cell.candidates - eliminated)
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
             for cell in self.sudoku.intersection(single)
             if cell.candidates and cell.candidates & eliminated
         ] + [single]
@@ -133,12 +239,12 @@ class HiddenSingle(Technique):
 
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
-        single = Cell(
+        single = Cell.unchecked(
             position=combination.cells[0].position,
             value=combination.values[0],
         )
         return [
-            Cell(position=cell.position, candidates=cell.candidates - eliminated)
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
             for cell in self.sudoku.intersection(single)
             if cell.candidates and cell.candidates & eliminated
         ] + [single]
@@ -163,7 +269,7 @@ class NakedPair(Technique):
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
         return [
-            Cell(position=cell.position, candidates=cell.candidates - eliminated)
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
             for cell in self.sudoku.intersection(*combination.cells)
             if cell.candidates and cell.candidates & eliminated
         ]
@@ -188,23 +294,65 @@ class NakedTriplet(Technique):
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
         return [
-            Cell(position=cell.position, candidates=cell.candidates - eliminated)
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
             for cell in self.sudoku.intersection(*combination.cells)
             if cell.candidates and cell.candidates & eliminated
         ]
 
 
-class LockedCandidate(Technique):
+class HiddenPair(Technique):
     def _find(self) -> Iterator[Combination]:
         for group in self.sudoku.groups():
-            candidate_map: Dict[int, List[Cell]] = {}
-            for cell in group:
-                if cell.candidates:
-                    for candidate in cell.candidates:
-                        candidate_map.setdefault(candidate, []).append(cell)
-
+            candidate_map = _candidate_map(group)
+            positions_map: Dict[Tuple[Position, ...], List[int]] = {}
             for candidate, cells in candidate_map.items():
                 if len(cells) == 2:
+                    positions = tuple(cell.position for cell in cells)
+                    positions_map.setdefault(positions, []).append(candidate)
+
+            for candidates in positions_map.values():
+                if len(candidates) == 2:
+                    yield Combination(
+                        name="Hidden Pair",
+                        cells=candidate_map[candidates[0]],
+                        values=candidates,
+                    )
+
+    def _get_changes(self, combination: Combination) -> List[Cell]:
+        return _keep_candidates(self.sudoku, combination)
+
+
+class HiddenTriplet(Technique):
+    def _find(self) -> Iterator[Combination]:
+        for group in self.sudoku.groups():
+            candidate_map = {
+                candidate: cells
+                for candidate, cells in _candidate_map(group).items()
+                if 2 <= len(cells) <= 3
+            }
+            for triplet in itertools.combinations(sorted(candidate_map), 3):
+                cells = {
+                    cell.position: cell
+                    for candidate in triplet
+                    for cell in candidate_map[candidate]
+                }
+                if len(cells) == 3:
+                    yield Combination(
+                        name="Hidden Triplet",
+                        cells=sorted(cells.values(), key=_by_position),
+                        values=list(triplet),
+                    )
+
+    def _get_changes(self, combination: Combination) -> List[Cell]:
+        return _keep_candidates(self.sudoku, combination)
+
+
+class LockedCandidate(Technique):
+    def _find(self) -> Iterator[Combination]:
+        for group in self.sudoku.groups():
+            for candidate, cells in _candidate_map(group).items():
+                # cells sharing only this group have nothing to eliminate
+                if len(cells) == 2 and _shared_groups(*cells) > 1:
                     yield Combination(
                         name="Locked Candidate", cells=cells, values=[candidate]
                     )
@@ -212,7 +360,31 @@ class LockedCandidate(Technique):
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
         return [
-            Cell(position=cell.position, candidates=cell.candidates - eliminated)
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
+            for cell in self.sudoku.intersection(*combination.cells)
+            if cell.candidates and cell.candidates & eliminated
+        ]
+
+
+class BoxLineReduction(Technique):
+    def _find(self) -> Iterator[Combination]:
+        for group in self.sudoku.groups():
+            for candidate, cells in _candidate_map(group).items():
+                if len(cells) > 1 and self._is_locked(cells):
+                    yield Combination(
+                        name="Box Line Reduction", cells=cells, values=[candidate]
+                    )
+
+    def _is_locked(self, cells: List[Cell]) -> bool:
+        rows = {cell.position.row for cell in cells}
+        columns = {cell.position.column for cell in cells}
+        boxes = {cell.position.box for cell in cells}
+        return len(boxes) == 1 and (len(rows) == 1 or len(columns) == 1)
+
+    def _get_changes(self, combination: Combination) -> List[Cell]:
+        eliminated = set(combination.values)
+        return [
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
             for cell in self.sudoku.intersection(*combination.cells)
             if cell.candidates and cell.candidates & eliminated
         ]
@@ -223,7 +395,7 @@ class XYWing(Technique):
         cells = [cell for cell in self.sudoku.cells() if len(cell.candidates) == 2]
         for triplet in itertools.combinations(cells, 3):
             if self._is_xy_wing(triplet):
-                wing = sorted(triplet, key=operator.attrgetter("position"))
+                wing = self._build_wing(triplet)
                 yield Combination(
                     name="XY Wing",
                     cells=wing,
@@ -240,15 +412,138 @@ class XYWing(Technique):
             return False
         return True
 
+    def _build_wing(self, cells: Tuple[Cell, ...]) -> List[Cell]:
+        pivot = next(
+            cell
+            for cell in cells
+            if all(self.sudoku.is_intersects(cell, c) for c in cells if c is not cell)
+        )
+        pincers = sorted((c for c in cells if c is not pivot), key=_by_position)
+        return [pincers[0], pivot, pincers[1]]
+
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
         return [
-            Cell(position=c.position, candidates=c.candidates - eliminated)
+            Cell.unchecked(c.position, candidates=c.candidates - eliminated)
             for c in self.sudoku.intersection(*[x for x in combination.cells[::2]])
             if c.candidates and c.candidates & eliminated
         ]
 
 
+class XWing(Technique):
+    name = "X Wing"
+    size = 2
+
+    def _find(self) -> Iterator[Combination]:
+        for lines, cover in (
+            (self.sudoku.rows(), operator.attrgetter("position.column")),
+            (self.sudoku.columns(), operator.attrgetter("position.row")),
+        ):
+            bases: Dict[int, List[List[Cell]]] = {}
+            for line in lines:
+                for candidate, cells in _candidate_map(line).items():
+                    if 2 <= len(cells) <= self.size:
+                        bases.setdefault(candidate, []).append(cells)
+
+            for candidate, candidate_bases in bases.items():
+                for base in itertools.combinations(candidate_bases, self.size):
+                    cells = [cell for cells in base for cell in cells]
+                    if len({cover(cell) for cell in cells}) == self.size:
+                        yield Combination(
+                            name=self.name, cells=cells, values=[candidate]
+                        )
+
+    def _get_changes(self, combination: Combination) -> List[Cell]:
+        eliminated = set(combination.values)
+        rows = {cell.position.row for cell in combination.cells}
+        columns = {cell.position.column for cell in combination.cells}
+        fish = {cell.position for cell in combination.cells}
+        return [
+            Cell.unchecked(cell.position, candidates=cell.candidates - eliminated)
+            for cell in self.sudoku.cells()
+            if cell.candidates & eliminated
+            and (cell.position.row in rows or cell.position.column in columns)
+            and cell.position not in fish
+        ]
+
+
+class Swordfish(XWing):
+    name = "Swordfish"
+    size = 3
+
+
+class SimpleColoring(Technique):
+    def _find(self) -> Iterator[Combination]:
+        for candidate in range(1, self.sudoku.size + 1):
+            conjugates = self._conjugates(candidate)
+            colored: Set[Position] = set()
+            for position in conjugates:
+                if position not in colored:
+                    colors = self._colorize(conjugates, position)
+                    colored.update(colors)
+                    yield Combination(
+                        name="Simple Coloring",
+                        cells=[self.sudoku[p.row, p.column] for p in colors],
+                        values=[candidate],
+                    )
+
+    def _get_changes(self, combination: Combination) -> List[Cell]:
+        candidate = combination.values[0]
+        conjugates = self._conjugates(candidate)
+        start = combination.cells[0].position
+        if start not in conjugates:
+            return []
+
+        colors = self._colorize(conjugates, start)
+        on = [position for position, color in colors.items() if color]
+        off = [position for position, color in colors.items() if not color]
+
+        eliminated: List[Position] = []
+        for positions in (on, off):
+            pairs = itertools.combinations(positions, 2)
+            if any(_is_intersects(a, b) for a, b in pairs):
+                eliminated.extend(positions)
+
+        if not eliminated:
+            eliminated = [
+                cell.position
+                for cell in self.sudoku.cells()
+                if candidate in cell.candidates
+                and cell.position not in colors
+                and any(_is_intersects(cell.position, p) for p in on)
+                and any(_is_intersects(cell.position, p) for p in off)
+            ]
+
+        return [
+            Cell.unchecked(cell.position, candidates=cell.candidates - {candidate})
+            for cell in (self.sudoku[p.row, p.column] for p in eliminated)
+            if candidate in cell.candidates
+        ]
+
+    def _conjugates(self, candidate: int) -> Dict[Position, List[Position]]:
+        conjugates: Dict[Position, List[Position]] = {}
+        for group in self.sudoku.groups():
+            cells = [cell for cell in group if candidate in cell.candidates]
+            if len(cells) == 2:
+                a, b = cells[0].position, cells[1].position
+                conjugates.setdefault(a, []).append(b)
+                conjugates.setdefault(b, []).append(a)
+        return conjugates
+
+    def _colorize(
+        self, conjugates: Dict[Position, List[Position]], start: Position
+    ) -> Dict[Position, bool]:
+        colors = {start: True}
+        stack = [start]
+        while stack:
+            position = stack.pop()
+            for neighbour in conjugates[position]:
+                if neighbour not in colors:
+                    colors[neighbour] = not colors[position]
+                    stack.append(neighbour)
+        return colors
+
+
 class UniqueRectangle(Technique):
     def _find(self) -> Iterator[Combination]:
         cells = [cell for cell in self.sudoku.cells() if len(cell.candidates) == 2]
@@ -291,7 +586,41 @@ class UniqueRectangle(Technique):
     def _get_changes(self, combination: Combination) -> List[Cell]:
         eliminated = set(combination.values)
         return [
-            Cell(position=cell.position, candidates=diff)
+            Cell.unchecked(cell.position, candidates=diff)
             for cell in combination.cells
             if (diff := cell.candidates - eliminated)
         ]
+
+
+def _by_position(cell: Cell) -> Position:
+    return cell.position
+
+
+def _candidate_map(group: Iterable[Cell]) -> Dict[int, List[Cell]]:
+    candidate_map: Dict[int, List[Cell]] = {}
+    for cell in group:
+        for candidate in cell.candidates:
+            candidate_map.setdefault(candidate, []).append(cell)
+    return candidate_map
+
+
+def _keep_candidates(sudoku: Sudoku, combination: Combination) -> List[Cell]:
+    kept = set(combination.values)
+    cells = (sudoku[c.position.row, c.position.column] for c in combination.cells)
+    return [
+        Cell.unchecked(cell.position, candidates=cell.candidates & kept)
+        for cell in cells
+        if cell.candidates - kept
+    ]
+
+
+def _shared_groups(a: Cell, b: Cell) -> int:
+    return (
+        (a.position.row == b.position.row)
+        + (a.position.column == b.position.column)
+        + (a.position.box == b.position.box)
+    )
+
+
+def _is_intersects(a: Position, b: Position) -> bool:
+    return a != b and (a.row == b.row or a.column == b.column or a.box == b.box)
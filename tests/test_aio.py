@@ -0,0 +1,64 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dokusan import aio, exceptions, solvers, stats
+from dokusan.boards import BoxSize, Sudoku
+from dokusan.search import Budget
+
+
+@pytest.fixture
+def sudoku():
+    return Sudoku.from_string(
+        "000090100000002300007001825604038900810000000009000008170000600900010743403060001",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+
+
+def test_backtrack(sudoku):
+    solution = asyncio.run(aio.backtrack(sudoku))
+    assert str(solution) == str(solvers.backtrack(sudoku))
+
+
+def test_rank(sudoku):
+    assert asyncio.run(aio.rank(sudoku)) == stats.rank(sudoku)
+
+
+def test_random_sudoku():
+    sudoku = asyncio.run(aio.random_sudoku(avg_rank=10))
+    assert sudoku.is_valid() is True
+
+
+def test_respects_budget():
+    with pytest.raises(exceptions.BudgetExceeded):
+        asyncio.run(aio.backtrack(Sudoku(box_size=BoxSize(3, 3)), Budget(max_nodes=0)))
+
+
+def test_cancel():
+    budget = Budget()
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    async def cancel():
+        task = asyncio.ensure_future(
+            aio.random_sudoku(box_size=BoxSize(5, 5), budget=budget, executor=executor)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    started = time.perf_counter()
+    executor.shutdown(wait=True)
+    assert budget.cancelled is True
+    assert time.perf_counter() - started < 1
+
+
+def test_default_executor():
+    executor = aio.default_executor()
+    assert aio.default_executor() is executor
+    aio.shutdown()
+    assert aio.default_executor() is not executor
+    aio.shutdown()
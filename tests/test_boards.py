@@ -1,4 +1,5 @@
 import operator
+import pickle
 
 import pytest
 
@@ -49,6 +50,18 @@ def test_cell():
         Cell(position=Position(0, 0, 0), value=2, candidates={2, 6, 9})
 
 
+def test_cell_unchecked():
+    cell = Cell.unchecked(Position(0, 0, 0), candidates={2, 6})
+    assert cell == Cell(position=Position(0, 0, 0), candidates={2, 6})
+    assert cell != Cell(position=Position(0, 0, 0), value=2)
+    assert not hasattr(cell, "__dict__")
+
+
+def test_cell_pickle():
+    cell = Cell(position=Position(0, 0, 0), candidates={2, 6})
+    assert pickle.loads(pickle.dumps(cell)) == cell
+
+
 def test_string_representation(sudoku_12x12):
     assert str(sudoku_12x12) == (
         "300974B1068C"
@@ -85,6 +98,55 @@ def test_from_string(sudoku_12x12):
     assert list(sudoku.cells()) == list(sudoku_12x12.cells())
 
 
+def test_from_string_with_delimiter(sudoku_12x12):
+    sudoku = Sudoku.from_string(
+        "3,,,9,7,4,11,1,,6,8,12\n"
+        "8,0,0,6,9,2,12,0,11,4,3,0\n"
+        "0,0,0,4,0,3,6,5,0,2,0,10\n"
+        "12,5,6,1,11,10,0,0,0,9,2,3\n"
+        "2,8,4,10,6,0,7,3,12,0,11,5\n"
+        "7,11,9,3,12,0,5,0,4,0,0,6\n"
+        "10,4,0,7,2,11,3,0,9,0,0,0\n"
+        "0,9,0,0,0,0,0,12,10,0,6,0\n"
+        "0,3,1,12,0,8,10,9,2,7,0,11\n"
+        "4,0,0,0,10,0,2,7,6,0,1,9\n"
+        "9,2,10,0,3,0,1,0,0,0,7,0\n"
+        "0,6,0,11,0,12,0,0,0,0,5,2\n",
+        box_size=BoxSize(3, 4),
+        delimiter=",",
+    )
+    assert list(sudoku.cells()) == list(sudoku_12x12.cells())
+
+
+def test_from_string_with_trailing_delimiter():
+    sudoku = Sudoku.from_string(
+        "1,2,3,4,\n3,4,1,2,\n2,1,4,3,\n4,3,2,,\n",
+        box_size=BoxSize(2, 2),
+        delimiter=",",
+    )
+    assert str(sudoku) == "1234341221434320"
+
+
+def test_from_string_with_delimiter_raises_on_wrong_size():
+    with pytest.raises(ValueError):
+        Sudoku.from_string("1,2,3,4,3,4,1,2", box_size=BoxSize(2, 2), delimiter=",")
+
+
+def test_to_string_with_delimiter():
+    sudoku = Sudoku.from_list(
+        [[value % 36 + 1 for value in range(i, i + 36)] for i in range(36)],
+        box_size=BoxSize(6, 6),
+    )
+    sudoku.update([Cell(position=Position(0, 1, 0))])
+
+    string = sudoku.to_string(delimiter=" ")
+
+    assert string.startswith("1 0 3 ")
+    assert string.endswith(" 34 35")
+    parsed = Sudoku.from_string(string, BoxSize(6, 6), delimiter=" ")
+    assert parsed.to_string(delimiter=" ") == string
+
+
 def test_getitem(sudoku):
     assert sudoku[0, 0] == Cell(position=Position(0, 0, 0), candidates=set())
     assert sudoku[2, 3] == Cell(position=Position(2, 3, 1), value=9)
@@ -110,6 +172,71 @@ def test_update(sudoku):
     assert sudoku[0, 1] is cell_b
 
 
+def test_groups_are_cached_until_update(sudoku):
+    row = next(sudoku.rows())
+    assert sudoku._view(0) is sudoku._view(0)
+
+    cell = Cell(position=Position(0, 0, 0), value=2)
+    sudoku.update([cell])
+
+    assert row[0] is not cell
+    assert next(sudoku.rows())[0] is cell
+    assert next(sudoku.columns())[0] is cell
+    assert next(sudoku.boxes())[0] is cell
+    assert list(sudoku.groups())[1] == list(sudoku.rows())[1]
+
+
+def test_groups_are_copied_for_callers(sudoku):
+    row = next(sudoku.rows())
+    row[0] = Cell(position=Position(0, 0, 0), value=2)
+    assert next(sudoku.rows())[0] is sudoku[0, 0]
+    assert isinstance(row, list)
+
+
+def test_groups_are_invalidated_on_undo(sudoku):
+    mark = sudoku.mark()
+    sudoku.update([Cell(position=Position(0, 0, 0), value=2)])
+    assert next(sudoku.boxes())[0].value == 2
+
+    sudoku.undo_to(mark)
+    assert next(sudoku.boxes())[0].value is None
+
+
+def test_undo_to(sudoku):
+    cell = sudoku[0, 0]
+
+    mark = sudoku.mark()
+    sudoku.update([Cell(position=Position(0, 0, 0), value=1)])
+    nested_mark = sudoku.mark()
+    sudoku.update([Cell(position=Position(0, 0, 0), value=2)])
+    assert sudoku[0, 0].value == 2
+
+    sudoku.undo_to(nested_mark)
+    assert sudoku[0, 0].value == 1
+
+    sudoku.undo_to(mark)
+    assert sudoku[0, 0] is cell
+
+
+def test_release(sudoku):
+    sudoku.mark()
+    sudoku.update([Cell(position=Position(0, 0, 0), value=1)])
+    sudoku.release()
+    cell = Cell(position=Position(0, 0, 0), value=2)
+    sudoku.update([cell])
+    assert sudoku._trail is None
+
+    sudoku.undo_to(0)
+    assert sudoku[0, 0] is cell
+
+
+def test_undo_to_without_mark(sudoku):
+    cell = Cell(position=Position(0, 0, 0), value=1)
+    sudoku.update([cell])
+    sudoku.undo_to(0)
+    assert sudoku[0, 0] is cell
+
+
 def test_cells(sudoku):
     cells = list(sudoku.cells())
     assert cells[0].candidates == set()
@@ -146,6 +273,39 @@ def test_boxes(sudoku):
     assert list(sudoku.boxes()) == expected
 
 
+def test_boxes_for_rectangular_box_size():
+    sudoku = Sudoku(box_size=BoxSize(2, 3))
+    boxes = [[cell.position[:2] for cell in box] for box in sudoku.boxes()]
+    assert boxes == [
+        [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)],
+        [(0, 3), (0, 4), (0, 5), (1, 3), (1, 4), (1, 5)],
+        [(2, 0), (2, 1), (2, 2), (3, 0), (3, 1), (3, 2)],
+        [(2, 3), (2, 4), (2, 5), (3, 3), (3, 4), (3, 5)],
+        [(4, 0), (4, 1), (4, 2), (5, 0), (5, 1), (5, 2)],
+        [(4, 3), (4, 4), (4, 5), (5, 3), (5, 4), (5, 5)],
+    ]
+    for i, box in enumerate(sudoku.boxes()):
+        assert {cell.position.box for cell in box} == {i}
+
+
+def test_box_size_indexes_for_rectangular_box_size():
+    box_size = BoxSize(3, 4)
+    assert list(box_size.indexes(4, 10)) == [
+        (3, 8),
+        (3, 9),
+        (3, 10),
+        (3, 11),
+        (4, 8),
+        (4, 9),
+        (4, 10),
+        (4, 11),
+        (5, 8),
+        (5, 9),
+        (5, 10),
+        (5, 11),
+    ]
+
+
 @pytest.mark.parametrize(
     ["puzzle", "solved"],
     [
@@ -326,6 +486,14 @@ def test_intersection_for_single_cell(sudoku):
     )
 
 
+def test_intersection_for_rectangular_box_size(sudoku_12x12):
+    intersection = sudoku_12x12.intersection(sudoku_12x12[4, 10])
+    assert len(intersection) == 28
+    assert sudoku_12x12[3, 8] in intersection
+    assert sudoku_12x12[6, 10] in intersection
+    assert sudoku_12x12[6, 11] not in intersection
+
+
 def test_intersection_between_two_cells(sudoku):
     by_position = operator.attrgetter("position")
     expected = list(sudoku.rows())[0][1:8]
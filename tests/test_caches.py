@@ -0,0 +1,75 @@
+import pickle
+
+from dokusan import caches
+from dokusan.boards import BoxSize, Cell, Sudoku
+
+
+def test_cache():
+    cache = caches.Cache(maxsize=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert len(cache) == 2
+
+
+def test_cache_maxbytes():
+    cache = caches.Cache(maxbytes=6)
+    cache.set("a", b"11")
+    cache.set("b", b"22")
+    assert cache.nbytes == 6
+
+    cache.set("c", b"33")
+    assert cache.get("a") is None
+    assert cache.nbytes == 6
+
+    cache.set("b", b"2")
+    assert cache.nbytes == 5
+
+
+def test_cache_counters():
+    cache = caches.Cache()
+    cache.set("a", b"1")
+    cache.get("a")
+    cache.get("b")
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_on_disk(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = caches.Cache(maxsize=1, path=path)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    assert caches.Cache(path=path).get("b") == b"2"
+
+
+def test_pickle_cache_on_disk(tmp_path):
+    cache = caches.Cache(path=str(tmp_path / "cache.db"))
+    cache.set("a", b"1")
+
+    restored = pickle.loads(pickle.dumps(cache))
+    restored.set("b", b"2")
+    assert cache.get("b") == b"2"
+
+
+def test_key():
+    sudoku = Sudoku.from_string("0200300014000340", box_size=BoxSize(2, 2))
+    assert caches.key(sudoku) == "2x2:0200300014000340"
+
+
+def test_key_ignores_candidates():
+    sudoku = Sudoku.from_string("0200300014000340", box_size=BoxSize(2, 2))
+    marked = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    marked.update([Cell(position=marked[0, 0].position, candidates={1, 4})])
+    assert caches.key(marked) == caches.key(sudoku)
+
+
+def test_key_for_large_board():
+    sudoku = Sudoku(box_size=BoxSize(4, 4))
+    assert caches.key(sudoku) == "4x4:" + ",".join(["0"] * 256)
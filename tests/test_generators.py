@@ -1,7 +1,8 @@
 import pytest
 
-from dokusan import generators
+from dokusan import caches, exceptions, generators, solvers
 from dokusan.boards import BoxSize, Sudoku
+from dokusan.search import Budget
 
 
 @pytest.mark.slow
@@ -17,6 +18,33 @@ def test_random_sudoku_returns_different_sudoku_every_call():
     generators.random_sudoku().cells() != generators.random_sudoku().cells()
 
 
+@pytest.mark.slow
+@pytest.mark.parametrize("box_size", [BoxSize(4, 4), BoxSize(5, 5)])
+def test_random_sudoku_large_boards(box_size):
+    sudoku = generators.random_sudoku(box_size=box_size)
+    assert sudoku.is_valid() is True
+    assert sudoku.is_solved() is False
+    assert solvers.backtrack(sudoku).is_solved() is True
+
+
+def test_random_sudoku_with_cache():
+    cache = caches.Cache()
+    sudoku = generators.random_sudoku(avg_rank=10, cache=cache)
+    assert sudoku.is_valid() is True
+    assert cache.misses == 1
+    assert len(cache) == 1
+
+
+def test_random_sudoku_raises_budget_exceeded():
+    with pytest.raises(exceptions.BudgetExceeded):
+        generators.random_sudoku(budget=Budget(max_nodes=0))
+
+
+def test_random_sudoku_shares_budget_between_searches():
+    with pytest.raises(exceptions.BudgetExceeded):
+        generators.random_sudoku(avg_rank=300, budget=Budget(max_seconds=0.01))
+
+
 def test_random_initial_cells():
     box_size = BoxSize(3, 3)
     cells = generators._random_initial_cells(box_size)
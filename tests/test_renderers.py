@@ -1,5 +1,10 @@
+import io
+from xml.dom import minidom
+
+import pytest
+
 from dokusan import renderers, techniques
-from dokusan.boards import BoxSize, Sudoku
+from dokusan.boards import BoxSize, Cell, Position, Sudoku
 
 
 def test_plain():
@@ -78,3 +83,128 @@ def test_colorful():
     )
     sudoku.update(techniques.BulkPencilMarking(sudoku).first().changes)
     assert "\033[93m2\033[0m" in renderers.colorful(sudoku)
+
+
+def test_renders_only_changed_rows():
+    sudoku = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    renderer = renderers.TermRenderer(
+        border=renderers.plain.border, colors=renderers.plain.colors
+    )
+    renderer(sudoku)
+
+    sudoku.update([Cell(position=Position(4, 4, 4), value=5)])
+    rendered = []
+    render_row = renderer.render_row
+    renderer.render_row = lambda *args: rendered.append(args) or render_row(*args)
+
+    assert renderer(sudoku) == renderers.plain(sudoku)
+    assert len(rendered) == 1
+
+
+def test_renders_cells_changed_in_place():
+    sudoku = Sudoku(box_size=BoxSize(2, 2))
+    renderer = renderers.TermRenderer(
+        border=renderers.plain.border, colors=renderers.plain.colors
+    )
+    renderer(sudoku)
+
+    sudoku[0, 0].value = 4
+    assert renderer(sudoku) == renderers.TermRenderer(
+        border=renderers.plain.border, colors=renderers.plain.colors
+    )(sudoku)
+
+
+def test_write():
+    sudoku = Sudoku.from_string(
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    stream = io.StringIO()
+    renderers.plain.write(sudoku, stream)
+    assert stream.getvalue() == renderers.plain(sudoku)
+
+
+def test_line():
+    puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"  # noqa: E501
+    sudoku = Sudoku.from_string(puzzle, box_size=BoxSize(3, 3))
+    assert renderers.line(sudoku) == puzzle
+
+
+def test_grid():
+    sudoku = Sudoku.from_string("0200300014000340", box_size=BoxSize(2, 2))
+    assert renderers.grid(sudoku) == "0200\n3000\n1400\n0340"
+    spaced = renderers.TextRenderer(delimiter=" ", newline="\n")
+    assert spaced(sudoku) == "0 2 0 0\n3 0 0 0\n1 4 0 0\n0 3 4 0"
+
+
+def test_export():
+    sudokus = [
+        Sudoku.from_string("0200300014000340", box_size=BoxSize(2, 2)),
+        Sudoku.from_string("1000000000000000", box_size=BoxSize(2, 2)),
+    ]
+    stream = io.StringIO()
+    renderers.export(sudokus, stream, renderers.line)
+    assert stream.getvalue() == "0200300014000340\n1000000000000000\n"
+
+
+def test_line_with_delimiter():
+    sudoku = Sudoku.from_string(
+        "0,2,0,0,3,0,0,0,1,4,0,0,0,3,4,0", box_size=BoxSize(2, 2), delimiter=","
+    )
+    renderer = renderers.TextRenderer(delimiter=",")
+    assert renderer(sudoku) == sudoku.to_string(delimiter=",")
+
+
+@pytest.fixture
+def naked_pair():
+    sudoku = Sudoku.from_string(
+        "000090100000002300007001825604038900810000000009000008170000600900010743403060001",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    sudoku.update(techniques.BulkPencilMarking(sudoku).first().changes)
+    return sudoku, techniques.NakedPair(sudoku).first()
+
+
+def test_html(naked_pair):
+    sudoku, step = naked_pair
+    html = renderers.html(sudoku, step)
+
+    minidom.parseString(html)
+    assert html.count("<td ") == 81
+    assert html.count('class="cell box-top box-left"') == 4
+    assert html.count(" highlight") == len(step.combination.cells)
+    assert '<span class="value">9</span>' in html
+    assert '<span><span class="candidate">5</span></span>' in html
+
+
+def test_svg(naked_pair):
+    sudoku, step = naked_pair
+    svg = renderers.svg(sudoku, step)
+
+    minidom.parseString(svg)
+    assert svg.count('class="highlight"') == len(step.combination.cells)
+    assert svg.count('class="value"') == len([c for c in sudoku.cells() if c.value])
+    assert svg.count('class="candidate"') == sum(
+        len(cell.candidates) for cell in sudoku.cells() if not cell.value
+    )
+
+
+@pytest.mark.parametrize("renderer", [renderers.html, renderers.svg])
+def test_markup_fragments_are_cached(renderer):
+    sudoku = Sudoku(box_size=BoxSize(2, 3))
+    fragments = renderer.fragments(sudoku.box_size)
+    assert renderer(sudoku) == renderer(sudoku)
+    assert renderer.fragments(sudoku.box_size) is fragments
@@ -0,0 +1,102 @@
+import pickle
+import struct
+
+import pytest
+
+from dokusan import caches, exceptions, replays, solvers, stats, techniques
+from dokusan.boards import BoxSize, Cell, Sudoku
+
+
+@pytest.fixture
+def sudoku():
+    return Sudoku.from_string(
+        "000090100000002300007001825604038900810000000009000008170000600900010743403060001",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+
+
+def test_techniques():
+    assert set(replays.TECHNIQUES) == set(stats.DIFFICULTY)
+
+
+def test_encode(sudoku):
+    steps = list(solvers.steps(sudoku))
+    log = replays.encode(steps, sudoku.box_size)
+    assert len(log) < len(pickle.dumps(steps))
+    assert list(replays.decode(sudoku, log)) == steps
+
+
+def test_encode_little_endian(sudoku):
+    step = techniques.BulkPencilMarking(sudoku).first()
+    log = replays.encode([step], sudoku.box_size)
+    assert log[:1] == b"H"
+    n = len(step.combination.cells)
+    assert log[1:7] == struct.pack("<3H", 0, n, 0)
+    assert len(log) == 1 + 2 * (4 + n + 3 * len(step.changes))
+
+
+def test_encode_large_board():
+    sudoku = Sudoku(box_size=BoxSize(6, 6))
+    steps = [techniques.BulkPencilMarking(sudoku).first()]
+    log = replays.encode(steps, sudoku.box_size)
+    assert log[:1] == b"Q"
+    assert list(replays.decode(sudoku, log)) == steps
+
+
+def test_replay(sudoku):
+    log = replays.encode(solvers.steps(sudoku), sudoku.box_size)
+    replays.replay(sudoku, log)
+    assert sudoku.is_solved() is True
+    assert sudoku.is_valid() is True
+
+
+def test_replay_empty_log(sudoku):
+    solution = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    replays.replay(solution, replays.encode([], sudoku.box_size))
+    assert list(solution.cells()) == list(sudoku.cells())
+
+
+def test_steps(sudoku):
+    cache = caches.Cache()
+    assert list(replays.steps(sudoku, cache)) == list(solvers.steps(sudoku))
+    assert len(cache) == 1
+    assert list(replays.steps(sudoku, cache)) == list(solvers.steps(sudoku))
+    assert len(cache) == 1
+
+
+def test_steps_unsolvable():
+    sudoku = Sudoku.from_string(
+        "078090000002805000000130000010080009043000086057000100600058040000004600024000590",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    cache = caches.Cache()
+    path = []
+    with pytest.raises(exceptions.Unsolvable):
+        for step in replays.steps(sudoku, cache):
+            path.append(step)
+
+    assert path
+    assert replays.hint(sudoku, cache, puzzle=sudoku) == path[0]
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("applied", [0, 1, 10, 30])
+def test_hint(sudoku, applied):
+    cache = caches.Cache()
+    steps = list(replays.steps(sudoku, cache))
+    state = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    for step in steps[:applied]:
+        state.update(step.changes)
+
+    assert replays.hint(state, cache, puzzle=sudoku) == steps[applied]
+
+
+def test_hint_off_the_path(sudoku):
+    cache = caches.Cache()
+    steps = list(replays.steps(sudoku, cache))
+    state = Sudoku(*sudoku.cells(), box_size=sudoku.box_size)
+    for step in steps[:10]:
+        state.update(step.changes)
+    state.update([Cell(position=state[0, 0].position, candidates={1, 2, 3})])
+
+    assert replays.hint(state, cache, puzzle=sudoku) == next(solvers.steps(state))
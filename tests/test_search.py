@@ -0,0 +1,308 @@
+import pickle
+
+import pytest
+
+from dokusan import exceptions, search
+from dokusan.boards import BoxSize, Cell, Position, Sudoku
+from dokusan.search import Budget, MinimumRemainingValues, SearchStats, SortedCandidates
+
+
+def test_budget():
+    budget = Budget()
+    budget.spend(depth=0)
+    budget.spend(depth=2)
+    budget.spend(depth=1)
+    assert budget.stats.nodes == 3
+    assert budget.stats.max_depth == 2
+
+
+def test_budget_raises_on_max_nodes():
+    budget = Budget(max_nodes=2)
+    budget.spend(depth=0)
+    budget.spend(depth=1)
+    with pytest.raises(exceptions.BudgetExceeded) as excinfo:
+        budget.spend(depth=2)
+
+    assert excinfo.value.stats.nodes == 3
+    assert excinfo.value.stats.max_depth == 2
+    assert excinfo.value.stats is not budget.stats
+
+
+def test_budget_raises_on_max_seconds():
+    budget = Budget(max_seconds=-1)
+    with pytest.raises(exceptions.BudgetExceeded) as excinfo:
+        budget.spend(depth=0)
+    assert excinfo.value.stats.nodes == 1
+
+
+def test_budget_start():
+    budget = Budget(max_nodes=1)
+    budget.spend(depth=0)
+    budget.start()
+    budget.spend(depth=0)
+    assert budget.stats.nodes == 1
+
+
+def test_budget_shared():
+    budget = Budget(max_nodes=1)
+    with budget.shared():
+        budget.spend(depth=0)
+        budget.start()
+        with pytest.raises(exceptions.BudgetExceeded):
+            budget.spend(depth=0)
+
+    budget.start()
+    budget.spend(depth=0)
+    assert budget.stats.nodes == 1
+
+
+def test_budget_raises_when_cancelled():
+    budget = Budget()
+    budget.spend(depth=0)
+    budget.cancel()
+    with pytest.raises(exceptions.Cancelled):
+        budget.spend(depth=1)
+
+
+def test_budget_exceeded_is_picklable():
+    exc = exceptions.BudgetExceeded("Exceeded 1 nodes", SearchStats(nodes=2))
+    unpickled = pickle.loads(pickle.dumps(exc))
+    assert str(unpickled) == "Exceeded 1 nodes"
+    assert unpickled.stats == SearchStats(nodes=2)
+
+
+def test_search():
+    sudoku = Sudoku.from_list(
+        [
+            [0, 0, 0, 8, 0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 4, 3],
+            [5, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 0, 0, 1, 0, 0],
+            [0, 2, 0, 0, 3, 0, 0, 0, 0],
+            [6, 0, 0, 0, 0, 0, 0, 7, 5],
+            [0, 0, 3, 4, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 6, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    given = str(sudoku)
+
+    solutions = list(search.search(sudoku))
+
+    assert len(solutions) == 1
+    assert solutions[0].sudoku.is_solved() is True
+    assert solutions[0].depth > 0
+    assert str(sudoku) == given
+
+
+def test_search_yields_every_solution():
+    sudoku = Sudoku.from_list(
+        [
+            [8, 1, 0, 0, 0, 0, 6, 7, 9],
+            [0, 0, 0, 6, 7, 9, 0, 2, 0],
+            [0, 0, 0, 1, 2, 8, 3, 0, 0],
+            [0, 3, 4, 0, 5, 7, 0, 0, 0],
+            [2, 0, 0, 0, 0, 0, 7, 0, 4],
+            [0, 0, 0, 0, 0, 6, 0, 0, 0],
+            [0, 0, 3, 7, 0, 1, 0, 6, 2],
+            [0, 0, 0, 0, 0, 0, 4, 0, 0],
+            [0, 0, 1, 0, 3, 0, 0, 8, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    solutions = [str(solution.sudoku) for solution in search.search(sudoku)]
+
+    assert len(solutions) > 1
+    assert len(set(solutions)) == len(solutions)
+
+
+def test_search_solved_sudoku():
+    sudoku = Sudoku.from_string(
+        (
+            "248593167561782394397641825"
+            "654138972812479536739256418"
+            "175324689926815743483967251"
+        ),
+        box_size=BoxSize(3, 3),
+    )
+
+    solutions = list(search.search(sudoku))
+
+    assert len(solutions) == 1
+    assert solutions[0].branch_factor == 1
+    assert solutions[0].depth == 0
+
+
+@pytest.mark.slow
+def test_search_16x16():
+    sudoku = Sudoku(box_size=BoxSize(4, 4))
+    solution = next(search.search(sudoku))
+    assert solution.sudoku.is_solved() is True
+    assert solution.depth > 0
+
+
+def test_bitmask_search():
+    sudoku = Sudoku.from_string(
+        "000801000000000043500000000"
+        "000070800000000100020030000"
+        "600000075003400000000200600",
+        box_size=BoxSize(3, 3),
+    )
+    stats = SearchStats()
+
+    solutions = list(search.bitmask_search(sudoku, stats=stats))
+
+    assert len(solutions) == 1
+    assert str(solutions[0].sudoku) == str(next(search.search(sudoku)).sudoku)
+    assert stats.nodes > 1
+    assert stats.propagations >= stats.nodes
+
+
+def test_bitmask_search_multiple_solutions():
+    sudoku = Sudoku.from_string(
+        "000000000000000043500000000"
+        "000070800000000100020030000"
+        "600000075003400000000200600",
+        box_size=BoxSize(3, 3),
+    )
+    solutions = search.bitmask_search(sudoku)
+    assert len([next(solutions), next(solutions)]) == 2
+
+
+def test_bitmask_search_conflicting_values():
+    sudoku = Sudoku.from_string("11", box_size=BoxSize(3, 3))
+    assert list(search.bitmask_search(sudoku)) == []
+
+
+def test_bitmask_search_raises_budget_exceeded():
+    sudoku = Sudoku(box_size=BoxSize(3, 3))
+    with pytest.raises(exceptions.BudgetExceeded):
+        next(search.bitmask_search(sudoku, budget=Budget(max_nodes=1)))
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("box_size", [BoxSize(4, 4), BoxSize(5, 5)])
+def test_bitmask_search_large_boards(box_size):
+    solution = next(search.bitmask_search(Sudoku(box_size=box_size)))
+    assert solution.sudoku.is_solved() is True
+    assert solution.sudoku.is_valid() is True
+
+
+def test_sorted_candidates_select():
+    sudoku = Sudoku(
+        Cell(position=Position(0, 0, 0), candidates={1, 2, 3}),
+        Cell(position=Position(0, 1, 0), candidates={1, 2}),
+        *[
+            Cell(position=Position(i, j, 0), value=9)
+            for i in range(9)
+            for j in range(9)
+            if (i, j) not in {(0, 0), (0, 1)}
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    assert SortedCandidates().select(sudoku) == sudoku[0, 1]
+
+
+def test_minimum_remaining_values_select():
+    sudoku = Sudoku(
+        Cell(position=Position(0, 0, 0), candidates={1, 2, 3}),
+        Cell(position=Position(0, 1, 0), candidates={4, 5}),
+        Cell(position=Position(8, 8, 8), candidates={1, 2}),
+        box_size=BoxSize(3, 3),
+    )
+    # unmarked empty cell means dead end and it is selected first
+    assert MinimumRemainingValues().select(sudoku) == sudoku[0, 2]
+
+
+def test_minimum_remaining_values_select_with_degree():
+    sudoku = Sudoku.from_string(
+        (
+            "123456700000000000000000000"
+            "000000000000000000000000000"
+            "000000000000000000000000000"
+        ),
+        box_size=BoxSize(3, 3),
+    )
+    sudoku.update(
+        [
+            Cell(position=cell.position, candidates={8, 9})
+            for cell in sudoku.cells()
+            if not cell.value
+        ]
+    )
+    assert MinimumRemainingValues().select(sudoku) == sudoku[0, 7]
+    assert MinimumRemainingValues(degree=True).select(sudoku) == sudoku[3, 7]
+
+
+def test_minimum_remaining_values_select_returns_none():
+    sudoku = Sudoku.from_string(
+        (
+            "248593167561782394397641825"
+            "654138972812479536739256418"
+            "175324689926815743483967251"
+        ),
+        box_size=BoxSize(3, 3),
+    )
+    assert MinimumRemainingValues().select(sudoku) is None
+
+
+def test_minimum_remaining_values_order():
+    sudoku = Sudoku(
+        Cell(position=Position(0, 0, 0), candidates={1, 2, 3}),
+        Cell(position=Position(0, 1, 0), candidates={1, 2}),
+        Cell(position=Position(1, 0, 0), candidates={1}),
+        box_size=BoxSize(3, 3),
+    )
+    branching = MinimumRemainingValues(least_constraining=True)
+    assert list(branching.order(sudoku, sudoku[0, 0])) == [3, 2, 1]
+    assert list(MinimumRemainingValues().order(sudoku, sudoku[0, 0])) == [1, 2, 3]
+
+
+def test_minimum_remaining_values_visits_fewer_nodes():
+    sudoku = Sudoku.from_string(
+        (
+            "800000000003600000070090200"
+            "050007000000045700000100030"
+            "001000068008500010090000400"
+        ),
+        box_size=BoxSize(3, 3),
+    )
+
+    budgets = {
+        branching: Budget()
+        for branching in (SortedCandidates(), MinimumRemainingValues())
+    }
+    for branching, budget in budgets.items():
+        solutions = list(search.search(sudoku, budget=budget, branching=branching))
+        assert len(solutions) == 1
+
+    sorted_candidates, mrv = budgets.values()
+    assert mrv.stats.nodes < sorted_candidates.stats.nodes
+
+
+@pytest.mark.parametrize(
+    "cooperative", [search.cooperative_search, search.cooperative_bitmask_search]
+)
+def test_cooperative_search(cooperative):
+    sudoku = Sudoku.from_string(
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    stats = SearchStats()
+    events = list(cooperative(sudoku, stats=stats, every=10))
+    solutions = [event for event in events if event is not None]
+
+    assert len(solutions) == 1
+    assert solutions[0].sudoku.is_solved() is True
+    assert len(events) - 1 == stats.nodes // 10
+
+
+def test_complete():
+    def task():
+        yield
+        yield
+        return 42
+
+    assert search.complete(task()) == 42
@@ -1,7 +1,10 @@
+from collections import Counter
+
 import pytest
 
-from dokusan import exceptions, solvers
-from dokusan.boards import BoxSize, Sudoku
+from dokusan import caches, exceptions, replays, search, solvers, techniques
+from dokusan.boards import BoxSize, Cell, Position, Sudoku
+from dokusan.search import Budget, SearchStats, SortedCandidates
 
 
 def test_eliminate():
@@ -34,6 +37,36 @@ def test_eliminate():
     )
 
 
+def test_eliminate_collects_stats():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    stats = SearchStats()
+
+    solvers.eliminate(given, stats=stats)
+
+    assert stats.nodes == 0
+    assert stats.propagations > 0
+    assert stats.technique_steps["BulkPencilMarking"] == 1
+    assert stats.technique_steps["LoneSingle"] > 0
+    assert set(stats.technique_time) == {
+        "BulkPencilMarking",
+        "LoneSingle",
+        "HiddenSingle",
+    }
+
+
 def test_backtrack():
     given = Sudoku.from_list(
         [
@@ -65,6 +98,240 @@ def test_backtrack():
     )
 
 
+def test_backtrack_with_cache():
+    given = Sudoku.from_string(
+        "000801000000000043500000000000070800000000100020030000600000075003400000000200600",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    cache = caches.Cache()
+    solution = solvers.backtrack(given, cache=cache)
+    assert cache.misses == 1
+
+    stats = SearchStats()
+    assert str(solvers.backtrack(given, cache=cache, stats=stats)) == str(solution)
+    assert cache.hits == 1
+    assert stats.nodes == 0
+
+
+def test_backtrack_shares_cache_with_replays():
+    given = Sudoku.from_string(
+        "000090100000002300007001825604038900810000000009000008170000600900010743403060001",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    cache = caches.Cache()
+    steps = list(replays.steps(given, cache))
+    solution = solvers.backtrack(given, cache=cache)
+    assert solution.is_solved() is True
+    assert list(replays.steps(given, cache)) == steps
+    assert str(solvers.backtrack(given, cache=cache)) == str(solution)
+
+
+def test_backtrack_with_cache_and_branching():
+    given = Sudoku(box_size=BoxSize(2, 2))
+    cache = caches.Cache()
+    solvers.backtrack(given, branching=SortedCandidates(), cache=cache)
+    assert len(cache) == 0
+
+
+def test_cooperative_backtrack():
+    given = Sudoku.from_string(
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    task = solvers.cooperative_backtrack(given, every=10)
+    next(task)
+    next(task)
+    assert str(search.complete(task)) == str(solvers.backtrack(given))
+
+
+def test_cooperative_backtrack_interleaves_tasks():
+    puzzles = [
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",  # noqa: E501
+        "000801000000000043500000000000070800000000100020030000600000075003400000000200600",  # noqa: E501
+    ]
+    tasks = {
+        i: solvers.cooperative_backtrack(
+            Sudoku.from_string(puzzle, box_size=BoxSize(3, 3)), every=5
+        )
+        for i, puzzle in enumerate(puzzles)
+    }
+    order, solutions = [], {}
+    while tasks:
+        for i, task in list(tasks.items()):
+            try:
+                next(task)
+                order.append(i)
+            except StopIteration as exc:
+                solutions[i] = exc.value
+                del tasks[i]
+
+    assert set(order[:2]) == {0, 1}
+    assert all(solution.is_solved() for solution in solutions.values())
+
+
+def test_cooperative_backtrack_can_be_abandoned():
+    task = solvers.cooperative_backtrack(Sudoku(box_size=BoxSize(4, 4)), every=1)
+    next(task)
+    task.close()
+    with pytest.raises(StopIteration):
+        next(task)
+
+
+def test_backtrack_raises_budget_exceeded():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 8, 0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 4, 3],
+            [5, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 0, 0, 1, 0, 0],
+            [0, 2, 0, 0, 3, 0, 0, 0, 0],
+            [6, 0, 0, 0, 0, 0, 0, 7, 5],
+            [0, 0, 3, 4, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 6, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    with pytest.raises(exceptions.BudgetExceeded) as excinfo:
+        solvers.backtrack(given, budget=Budget(max_nodes=5))
+
+    assert excinfo.value.stats.nodes == 6
+    assert excinfo.value.stats.max_depth > 0
+
+
+@pytest.mark.parametrize("box_size", [BoxSize(3, 3), BoxSize(4, 4)])
+def test_backtrack_reuses_budget(box_size):
+    budget = Budget(max_nodes=500)
+    solvers.backtrack(Sudoku(box_size=box_size), budget=budget)
+    nodes = budget.stats.nodes
+
+    for _ in range(3):
+        solvers.backtrack(Sudoku(box_size=box_size), budget=budget)
+        assert budget.stats.nodes == nodes
+
+
+def test_backtrack_collects_stats():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 8, 0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 4, 3],
+            [5, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 0, 0, 1, 0, 0],
+            [0, 2, 0, 0, 3, 0, 0, 0, 0],
+            [6, 0, 0, 0, 0, 0, 0, 7, 5],
+            [0, 0, 3, 4, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 6, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    stats = SearchStats()
+
+    solvers.backtrack(given, stats=stats)
+
+    assert stats.nodes > 1
+    assert stats.max_depth > 0
+    assert stats.backtracks > 0
+    assert stats.propagations >= stats.nodes
+    assert stats.elapsed > 0
+    assert stats.technique_steps["BulkPencilMarking"] == stats.nodes
+
+
+def test_backtrack_rectangular_box_size():
+    solution = solvers.backtrack(Sudoku(box_size=BoxSize(3, 4)))
+    assert solution.is_solved() is True
+    assert solution.is_valid() is True
+
+
+def test_backtrack_large_board():
+    stats = SearchStats()
+
+    solution = solvers.backtrack(Sudoku(box_size=BoxSize(4, 4)), stats=stats)
+
+    assert solution.is_solved() is True
+    assert solution.is_valid() is True
+    assert stats.nodes > 0
+    assert stats.technique_steps == {}
+
+
+def test_hybrid():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 8, 0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 4, 3],
+            [5, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 0, 0, 1, 0, 0],
+            [0, 2, 0, 0, 3, 0, 0, 0, 0],
+            [6, 0, 0, 0, 0, 0, 0, 7, 5],
+            [0, 0, 3, 4, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 6, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    backtrack_stats, hybrid_stats = SearchStats(), SearchStats()
+
+    expected = solvers.backtrack(given, stats=backtrack_stats)
+    solution = solvers.hybrid(given, stats=hybrid_stats)
+
+    assert solution.is_solved() is True
+    assert solution.is_valid() is True
+    assert str(solution) == str(expected)
+    assert hybrid_stats.nodes < backtrack_stats.nodes
+    assert hybrid_stats.technique_steps["NakedPair"] > 0
+    assert "BulkPencilMarking" not in hybrid_stats.technique_steps
+
+
+def test_hybrid_solved_sudoku():
+    solution = solvers.backtrack(Sudoku(box_size=BoxSize(3, 3)))
+    assert str(solvers.hybrid(solution)) == str(solution)
+
+
+def test_hybrid_pencil_marked_sudoku():
+    given = Sudoku.from_string(
+        "000090100000002300007001825604038900810000000009000008170000600900010743403060001",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    given.update(techniques.BulkPencilMarking(given).first().changes)
+
+    solution = solvers.hybrid(given)
+    assert solution.is_solved() is True
+    assert str(solution) == str(solvers.backtrack(given))
+
+
+def test_hybrid_skips_unprofitable_techniques():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 8, 0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 4, 3],
+            [5, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 0, 0, 1, 0, 0],
+            [0, 2, 0, 0, 3, 0, 0, 0, 0],
+            [6, 0, 0, 0, 0, 0, 0, 7, 5],
+            [0, 0, 3, 4, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 6, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    propagation = solvers.HybridPropagation(
+        [techniques.NakedPair, techniques.LockedCandidate], probe=1000
+    )
+    propagation.node_time, propagation.nodes = 0.001, 1
+    for level in range(given.size + 1):
+        propagation.metrics[techniques.NakedPair, level] = techniques.Metrics(
+            invocations=100, hits=0, time=1.0
+        )
+    stats = SearchStats()
+
+    solution = solvers.hybrid(given, techniques=propagation, stats=stats)
+
+    assert solution.is_solved() is True
+    assert "NakedPair" not in stats.technique_steps
+    assert stats.technique_steps["LockedCandidate"] >= 0
+    assert propagation.nodes == stats.nodes + 1
+
+
 def test_steps():
     given = Sudoku.from_list(
         [
@@ -91,29 +358,211 @@ def test_steps():
         "Locked Candidate",
         "XY Wing",
         *["Hidden Single"] * 2,
-        "Unique Rectangle",
-        "Hidden Single",
-        *["Lone Single"] * 2,
-        "Hidden Single",
-        *["Lone Single"] * 28,
+        "Simple Coloring",
+        *["Lone Single"] * 32,
     ]
 
 
+def test_steps_in_bulk():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    techniques.reset_metrics()
+    techniques.Technique.collect_metrics = True
+    try:
+        list(solvers.steps(given))
+        invocations = techniques.LoneSingle.metrics().invocations
+        techniques.reset_metrics()
+        bulk_steps = list(solvers.steps(given, bulk=True))
+        bulk_invocations = techniques.LoneSingle.metrics().invocations
+    finally:
+        techniques.Technique.collect_metrics = False
+        techniques.reset_metrics()
+
+    assert bulk_invocations < invocations
+    # in bulk both coloring steps are applied before singles make one redundant
+    assert Counter(step.combination.name for step in bulk_steps) == {
+        "Bulk Pencil Marking": 1,
+        "Lone Single": 41,
+        "Hidden Single": 10,
+        "Naked Pair": 3,
+        "Locked Candidate": 1,
+        "XY Wing": 1,
+        "Simple Coloring": 2,
+    }
+
+    for step in bulk_steps:
+        given.update(step.changes)
+    assert given.is_solved() is True
+    assert given.is_valid() is True
+
+
+@pytest.mark.parametrize(
+    ["previous", "cell", "merged"],
+    [
+        (None, {2, 3}, {2, 3}),
+        (5, {2, 3}, None),
+        ({2, 3}, 5, 5),
+        ({2, 3, 4}, {2, 3, 5}, {2, 3}),
+        ({2, 3}, {2, 3, 5}, None),
+    ],
+)
+def test_merge(previous, cell, merged):
+    def make_cell(value):
+        if value is None:
+            return None
+        if isinstance(value, int):
+            return Cell(position=Position(0, 0, 0), value=value)
+        return Cell(position=Position(0, 0, 0), candidates=value)
+
+    assert solvers._merge(make_cell(previous), make_cell(cell)) == make_cell(merged)
+
+
+def test_steps_collects_stats():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    stats = SearchStats()
+
+    steps = list(solvers.steps(given, stats=stats))
+
+    assert sum(stats.technique_steps.values()) == len(steps)
+    assert stats.technique_steps["SimpleColoring"] == 1
+    assert stats.technique_steps["NakedTriplet"] == 0
+    assert stats.technique_time["NakedTriplet"] > 0
+
+
 def test_steps_raises_unsolvable():
     given = Sudoku.from_list(
         [
-            [7, 0, 0, 0, 8, 2, 5, 0, 0],
-            [0, 5, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 9, 0, 7, 0, 2, 6],
-            [0, 0, 8, 0, 9, 0, 0, 7, 5],
-            [3, 0, 0, 6, 7, 5, 0, 0, 0],
-            [0, 0, 0, 0, 2, 0, 0, 9, 0],
-            [9, 0, 1, 0, 0, 3, 0, 0, 0],
-            [0, 0, 0, 0, 6, 0, 0, 0, 3],
-            [6, 0, 2, 0, 0, 0, 0, 0, 0],
+            [0, 7, 8, 0, 9, 0, 0, 0, 0],
+            [0, 0, 2, 8, 0, 5, 0, 0, 0],
+            [0, 0, 0, 1, 3, 0, 0, 0, 0],
+            [0, 1, 0, 0, 8, 0, 0, 0, 9],
+            [0, 4, 3, 0, 0, 0, 0, 8, 6],
+            [0, 5, 7, 0, 0, 0, 1, 0, 0],
+            [6, 0, 0, 0, 5, 8, 0, 4, 0],
+            [0, 0, 0, 0, 0, 4, 6, 0, 0],
+            [0, 2, 4, 0, 0, 0, 5, 9, 0],
         ],
         box_size=BoxSize(3, 3),
     )
 
     with pytest.raises(exceptions.Unsolvable):
         list(solvers.steps(given))
+
+
+def test_steps_with_techniques_iterator():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    steps = solvers.steps(given, techniques=iter(solvers.TECHNIQUES))
+    assert list(steps) == list(solvers.steps(given))
+
+
+def test_steps_with_custom_techniques():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    steps = solvers.steps(given, techniques=[techniques.HiddenSingle])
+    with pytest.raises(exceptions.Unsolvable):
+        for step in steps:
+            assert step.combination.name in {"Bulk Pencil Marking", "Hidden Single"}
+
+
+def test_adaptive_order():
+    order = solvers.AdaptiveOrder(
+        [techniques.LoneSingle, techniques.HiddenSingle, techniques.XYWing],
+        warmup=2,
+    )
+    assert list(order) == [
+        techniques.LoneSingle,
+        techniques.HiddenSingle,
+        techniques.XYWing,
+    ]
+
+    for _ in range(2):
+        order.record(techniques.LoneSingle, elapsed=0.3, hit=True)
+        order.record(techniques.HiddenSingle, elapsed=0.1, hit=True)
+        order.record(techniques.XYWing, elapsed=0.1, hit=False)
+
+    assert list(order) == [
+        techniques.HiddenSingle,
+        techniques.LoneSingle,
+        techniques.XYWing,
+    ]
+    assert order.metrics[techniques.LoneSingle] == techniques.Metrics(
+        invocations=2, hits=2, time=0.6
+    )
+
+
+def test_steps_with_adaptive_order():
+    given = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    order = solvers.AdaptiveOrder(warmup=5)
+
+    for _ in range(2):
+        steps = list(solvers.steps(given, techniques=order))
+        assert steps[-1].combination.name in {"Lone Single", "Hidden Single"}
+
+    assert order.metrics[techniques.LoneSingle].hits > 0
+    assert order.metrics[techniques.LoneSingle].invocations > order.warmup
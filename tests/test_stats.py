@@ -1,7 +1,8 @@
 import pytest
 
-from dokusan import exceptions, stats
+from dokusan import exceptions, search, stats
 from dokusan.boards import BoxSize, Sudoku
+from dokusan.search import Budget, SearchStats
 
 
 @pytest.mark.parametrize(
@@ -89,3 +90,214 @@ def test_rank_sudoku_with_multiple_solutions():
     sudoku = Sudoku.from_list(puzzle, box_size=BoxSize(3, 3))
     with pytest.raises(exceptions.MultipleSolutions):
         stats.rank(sudoku)
+
+
+def test_rank_raises_budget_exceeded():
+    puzzle = [
+        [3, 7, 0, 0, 0, 9, 0, 0, 6],
+        [8, 0, 0, 1, 0, 3, 0, 7, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 8],
+        [0, 2, 0, 0, 8, 0, 0, 0, 5],
+        [1, 8, 7, 0, 0, 0, 6, 4, 2],
+        [5, 0, 0, 0, 2, 0, 0, 1, 0],
+        [7, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 5, 0, 6, 0, 2, 0, 0, 7],
+        [2, 0, 0, 3, 0, 0, 0, 6, 1],
+    ]
+    sudoku = Sudoku.from_list(puzzle, box_size=BoxSize(3, 3))
+    with pytest.raises(exceptions.BudgetExceeded):
+        stats.rank(sudoku, budget=Budget(max_nodes=1))
+
+
+def test_rank_collects_stats():
+    puzzle = [
+        [3, 7, 0, 0, 0, 9, 0, 0, 6],
+        [8, 0, 0, 1, 0, 3, 0, 7, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 8],
+        [0, 2, 0, 0, 8, 0, 0, 0, 5],
+        [1, 8, 7, 0, 0, 0, 6, 4, 2],
+        [5, 0, 0, 0, 2, 0, 0, 1, 0],
+        [7, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 5, 0, 6, 0, 2, 0, 0, 7],
+        [2, 0, 0, 3, 0, 0, 0, 6, 1],
+    ]
+    sudoku = Sudoku.from_list(puzzle, box_size=BoxSize(3, 3))
+    search_stats = SearchStats()
+    stats.rank(sudoku, stats=search_stats)
+    assert search_stats.nodes == 12
+
+
+def test_rank_unsolvable_sudoku():
+    puzzle = [
+        [1, 2, 3, 4, 5, 6, 7, 8, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 9],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    ]
+    sudoku = Sudoku.from_list(puzzle, box_size=BoxSize(3, 3))
+    with pytest.raises(exceptions.Unsolvable):
+        stats.rank(sudoku)
+
+
+def test_rank_many():
+    puzzles = [
+        (
+            "370009006800103070000000008"
+            "020080005187000642500020010"
+            "700000000050602007200300061"
+        ),
+        (
+            "403920007050007900760345802"
+            "104890005000006140000001089"
+            "008634051500009000000002308"
+        ),
+        (
+            "810000679000679020000128300"
+            "034057000200000704000006000"
+            "003701062000000400001030080"
+        ),
+        (
+            "123456780000000009000000000"
+            "000000000000000000000000000"
+            "000000000000000000000000000"
+        ),
+    ]
+    sudokus = [Sudoku.from_string(p, box_size=BoxSize(3, 3)) for p in puzzles]
+
+    results = dict(stats.rank_many(sudokus, workers=2))
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[0] == 451
+    assert results[1] == 44
+    assert isinstance(results[2], exceptions.MultipleSolutions)
+    assert isinstance(results[3], exceptions.Unsolvable)
+
+
+def test_rank_many_with_timeout():
+    sudoku = Sudoku.from_string(
+        (
+            "370009006800103070000000008"
+            "020080005187000642500020010"
+            "700000000050602007200300061"
+        ),
+        box_size=BoxSize(3, 3),
+    )
+
+    results = list(stats.rank_many([sudoku], workers=1, timeout=0))
+
+    assert len(results) == 1
+    assert results[0][0] == 0
+    assert isinstance(results[0][1], exceptions.BudgetExceeded)
+
+
+def test_rank_many_submits_puzzles_lazily():
+    submitted = []
+
+    def puzzles():
+        for i in range(100):
+            submitted.append(i)
+            yield Sudoku.from_string(
+                (
+                    "370009006800103070000000008"
+                    "020080005187000642500020010"
+                    "700000000050602007200300061"
+                ),
+                box_size=BoxSize(3, 3),
+            )
+
+    results = stats.rank_many(puzzles(), workers=1)
+    assert next(results) == (0, 451)
+    results.close()
+
+    assert len(submitted) <= 3
+
+
+def test_rate():
+    sudoku = Sudoku.from_list(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    rating = stats.rate(sudoku)
+    assert rating.solved is True
+    assert rating.hardest == "Simple Coloring"
+    assert rating.techniques == {
+        "Bulk Pencil Marking": 1,
+        "Lone Single": 41,
+        "Hidden Single": 10,
+        "Naked Pair": 3,
+        "Locked Candidate": 1,
+        "XY Wing": 1,
+        "Simple Coloring": 1,
+    }
+    assert rating.score == 1200 + 41 * 1 + 10 * 2 + 3 * 3 + 7 + 10 + 12
+
+
+def test_rate_solved_sudoku():
+    sudoku = Sudoku.from_list(
+        [
+            [2, 4, 8, 5, 9, 3, 1, 6, 7],
+            [5, 6, 1, 7, 8, 2, 3, 9, 4],
+            [3, 9, 7, 6, 4, 1, 8, 2, 5],
+            [6, 5, 4, 1, 3, 8, 9, 7, 2],
+            [8, 1, 2, 4, 7, 9, 5, 3, 6],
+            [7, 3, 9, 2, 5, 6, 4, 1, 8],
+            [1, 7, 5, 3, 2, 4, 6, 8, 9],
+            [9, 2, 6, 8, 1, 5, 7, 4, 3],
+            [4, 8, 3, 9, 6, 7, 2, 5, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    assert stats.rate(sudoku) == stats.Rating(
+        score=0, hardest=None, techniques={}, solved=True
+    )
+
+
+def test_rate_unsolvable_sudoku():
+    sudoku = Sudoku.from_list(
+        [
+            [0, 7, 8, 0, 9, 0, 0, 0, 0],
+            [0, 0, 2, 8, 0, 5, 0, 0, 0],
+            [0, 0, 0, 1, 3, 0, 0, 0, 0],
+            [0, 1, 0, 0, 8, 0, 0, 0, 9],
+            [0, 4, 3, 0, 0, 0, 0, 8, 6],
+            [0, 5, 7, 0, 0, 0, 1, 0, 0],
+            [6, 0, 0, 0, 5, 8, 0, 4, 0],
+            [0, 0, 0, 0, 0, 4, 6, 0, 0],
+            [0, 2, 4, 0, 0, 0, 5, 9, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    rating = stats.rate(sudoku)
+    assert rating.solved is False
+    assert rating.hardest == stats.SEARCH
+    assert rating.score == (max(stats.DIFFICULTY.values()) + 1) * 100 + sum(
+        stats.DIFFICULTY[name] * count for name, count in rating.techniques.items()
+    )
+
+
+def test_cooperative_rank():
+    sudoku = Sudoku.from_string(
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",  # noqa: E501
+        box_size=BoxSize(3, 3),
+    )
+    task = stats.cooperative_rank(sudoku, every=10)
+    next(task)
+    assert search.complete(task) == stats.rank(sudoku)
@@ -26,6 +26,90 @@ def test_combination_as_str():
     assert str(combination) == "Naked Pair: `2, 5` at (6, 3), (6, 6)"
 
 
+def test_step_has_no_instance_dict():
+    combination = techniques.Combination(name="Lone Single", cells=[], values=[1])
+    step = techniques.Step(combination=combination, changes=[])
+
+    assert not hasattr(combination, "__dict__")
+    assert not hasattr(step, "__dict__")
+
+
+def test_technique_metrics():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    techniques.reset_metrics()
+    techniques.Technique.collect_metrics = True
+    try:
+        step = techniques.LoneSingle(sudoku).first()
+        steps = list(techniques.LoneSingle(sudoku))
+        with pytest.raises(techniques.NotFound):
+            techniques.XYWing(sudoku).first()
+    finally:
+        techniques.Technique.collect_metrics = False
+
+    assert step == steps[0]
+
+    metrics = techniques.metrics()
+    assert set(metrics) == {"LoneSingle", "XYWing"}
+    assert metrics["LoneSingle"].invocations == 2
+    assert metrics["LoneSingle"].hits == len(steps) + 1
+    assert metrics["LoneSingle"].cells_scanned >= len(steps) + 1
+    assert metrics["LoneSingle"].time > 0
+    assert metrics["XYWing"].invocations == 1
+    assert metrics["XYWing"].hits == 0
+    assert metrics["XYWing"].cells_scanned >= sudoku.size * sudoku.size
+
+    techniques.LoneSingle(sudoku).first()
+    assert techniques.LoneSingle.metrics().invocations == 2
+    assert techniques.metrics()["LoneSingle"] == metrics["LoneSingle"]
+
+    techniques.reset_metrics()
+    assert techniques.metrics() == {}
+
+
+def test_technique_metrics_reusing_instance():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 9, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 2, 3, 0, 0],
+            [0, 0, 7, 0, 0, 1, 8, 2, 5],
+            [6, 0, 4, 0, 3, 8, 9, 0, 0],
+            [8, 1, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 9, 0, 0, 0, 0, 0, 8],
+            [1, 7, 0, 0, 0, 0, 6, 0, 0],
+            [9, 0, 0, 0, 1, 0, 7, 4, 3],
+            [4, 0, 3, 0, 6, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+    technique = techniques.NakedPair(sudoku)
+    techniques.reset_metrics()
+    techniques.Technique.collect_metrics = True
+    try:
+        list(technique)
+        scanned = techniques.NakedPair.metrics().cells_scanned
+        list(technique)
+    finally:
+        techniques.Technique.collect_metrics = False
+
+    assert scanned > 0
+    assert techniques.NakedPair.metrics().cells_scanned == 2 * scanned
+    assert technique.sudoku is sudoku
+    techniques.reset_metrics()
+
+
 def test_pencil_marking():
     sudoku = Sudoku.from_list(
         [
@@ -338,6 +422,66 @@ def test_naked_triplet_not_found():
         techniques.NakedTriplet(sudoku).first()
 
 
+def test_hidden_pair():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 8, 0, 1, 0, 7, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 8, 3, 0],
+            [0, 0, 0, 0, 6, 8, 0, 0, 0],
+            [4, 0, 8, 0, 0, 0, 0, 1, 2],
+            [7, 6, 0, 0, 4, 0, 0, 0, 0],
+            [0, 0, 0, 5, 0, 3, 0, 0, 1],
+            [6, 0, 4, 8, 0, 0, 5, 0, 0],
+            [0, 0, 5, 4, 9, 0, 0, 0, 7],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    hidden_pair = techniques.HiddenPair(sudoku).first()
+
+    assert hidden_pair.combination.cells == [
+        Cell(position=Position(6, 6, 8), candidates={2, 4, 6, 9}),
+        Cell(position=Position(6, 7, 8), candidates={2, 4, 6, 8, 9}),
+    ]
+    assert hidden_pair.combination.values == [4, 6]
+    assert hidden_pair.changes == [
+        Cell(position=Position(6, 6, 8), candidates={4, 6}),
+        Cell(position=Position(6, 7, 8), candidates={4, 6}),
+    ]
+
+
+def test_hidden_triplet():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 8, 0, 1, 0, 7, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 8, 3, 0],
+            [0, 0, 0, 0, 6, 8, 0, 0, 0],
+            [4, 0, 8, 0, 0, 0, 0, 1, 2],
+            [7, 6, 0, 0, 4, 0, 0, 0, 0],
+            [0, 0, 0, 5, 0, 3, 0, 0, 1],
+            [6, 0, 4, 8, 0, 0, 5, 0, 0],
+            [0, 0, 5, 4, 9, 0, 0, 0, 7],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    hidden_triplet = techniques.HiddenTriplet(sudoku).first()
+
+    assert hidden_triplet.combination.cells == [
+        Cell(position=Position(6, 0, 6), candidates={2, 8, 9}),
+        Cell(position=Position(6, 6, 8), candidates={2, 4, 6, 9}),
+        Cell(position=Position(6, 7, 8), candidates={2, 4, 6, 8, 9}),
+    ]
+    assert hidden_triplet.combination.values == [4, 6, 8]
+    assert hidden_triplet.changes == [
+        Cell(position=Position(6, 0, 6), candidates={8}),
+        Cell(position=Position(6, 6, 8), candidates={4, 6}),
+        Cell(position=Position(6, 7, 8), candidates={4, 6, 8}),
+    ]
+
+
 def test_locked_candidate_in_a_box():
     sudoku = make_sudoku_with_marks(
         [
@@ -440,6 +584,37 @@ def test_locked_candidate_not_found():
         techniques.LockedCandidate(sudoku).first()
 
 
+def test_box_line_reduction():
+    sudoku = make_sudoku_with_marks(
+        [
+            [1, 0, 0, 0, 0, 7, 0, 9, 0],
+            [0, 3, 0, 0, 2, 0, 0, 0, 8],
+            [0, 0, 9, 6, 0, 0, 5, 0, 0],
+            [0, 0, 5, 3, 0, 0, 9, 0, 0],
+            [0, 1, 0, 0, 8, 0, 0, 0, 2],
+            [6, 0, 0, 0, 0, 4, 0, 0, 0],
+            [3, 0, 0, 0, 0, 0, 0, 1, 0],
+            [0, 4, 0, 0, 0, 0, 0, 0, 7],
+            [0, 0, 7, 0, 0, 0, 3, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    box_line_reduction = techniques.BoxLineReduction(sudoku).first()
+
+    assert box_line_reduction.combination.cells == [
+        Cell(position=Position(8, 3, 7), candidates={1, 2, 4, 5, 8, 9}),
+        Cell(position=Position(8, 4, 7), candidates={1, 4, 5, 6, 9}),
+        Cell(position=Position(8, 5, 7), candidates={1, 2, 5, 6, 8, 9}),
+    ]
+    assert box_line_reduction.combination.values == [1]
+    assert box_line_reduction.changes == [
+        Cell(position=Position(7, 4, 7), candidates={3, 5, 6, 9}),
+        Cell(position=Position(7, 3, 7), candidates={2, 5, 8, 9}),
+        Cell(position=Position(7, 5, 7), candidates={2, 3, 5, 6, 8, 9}),
+    ]
+
+
 def test_xy_wing():
     sudoku = make_sudoku_with_marks(
         [
@@ -492,6 +667,129 @@ def test_xy_wing_not_found():
         techniques.XYWing(sudoku).first()
 
 
+def test_x_wing():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 0, 0, 0, 5, 9],
+            [0, 9, 0, 8, 0, 5, 0, 4, 0],
+            [0, 3, 6, 0, 0, 0, 0, 0, 2],
+            [2, 0, 0, 0, 0, 0, 0, 0, 7],
+            [0, 0, 0, 0, 0, 0, 9, 0, 0],
+            [0, 7, 0, 0, 9, 6, 0, 0, 0],
+            [0, 2, 0, 3, 0, 0, 6, 0, 0],
+            [0, 0, 1, 2, 0, 4, 0, 0, 0],
+            [7, 0, 5, 6, 0, 0, 0, 0, 1],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    x_wing = techniques.XWing(sudoku).first()
+
+    assert x_wing.combination.cells == [
+        Cell(position=Position(5, 6, 5), candidates={1, 2, 3, 4, 5, 8}),
+        Cell(position=Position(5, 7, 5), candidates={1, 2, 3, 8}),
+        Cell(position=Position(8, 6, 8), candidates={2, 3, 4, 8}),
+        Cell(position=Position(8, 7, 8), candidates={2, 3, 8, 9}),
+    ]
+    assert x_wing.combination.values == [2]
+    assert x_wing.changes == [
+        Cell(position=Position(4, 7, 5), candidates={1, 3, 6, 8}),
+    ]
+
+
+def test_swordfish():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 0, 1, 4, 9, 0],
+            [0, 0, 0, 4, 0, 0, 0, 3, 0],
+            [0, 6, 0, 8, 9, 5, 0, 0, 0],
+            [0, 9, 0, 6, 0, 3, 0, 0, 2],
+            [2, 8, 5, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 4, 0, 0, 1],
+            [0, 0, 0, 0, 0, 0, 6, 0, 3],
+            [3, 0, 1, 0, 0, 0, 5, 0, 0],
+            [6, 0, 0, 0, 1, 0, 0, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    swordfish = techniques.Swordfish(sudoku).first()
+
+    assert swordfish.combination.cells == [
+        Cell(position=Position(0, 4, 1), candidates={2, 3, 6, 7}),
+        Cell(position=Position(0, 8, 2), candidates={5, 6, 7, 8}),
+        Cell(position=Position(1, 4, 1), candidates={2, 6, 7}),
+        Cell(position=Position(1, 5, 1), candidates={2, 6, 7}),
+        Cell(position=Position(1, 8, 2), candidates={5, 6, 7, 8}),
+        Cell(position=Position(7, 4, 7), candidates={2, 4, 6, 7, 8}),
+        Cell(position=Position(7, 5, 7), candidates={2, 6, 7, 8, 9}),
+    ]
+    assert swordfish.combination.values == [6]
+    assert swordfish.changes == [
+        Cell(position=Position(4, 8, 5), candidates={4, 7, 9}),
+    ]
+
+
+def test_simple_coloring():
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [6, 3, 0, 0, 0, 0, 9, 2, 7],
+            [2, 0, 0, 9, 0, 0, 0, 1, 6],
+            [0, 9, 0, 0, 4, 0, 0, 0, 8],
+            [7, 0, 0, 1, 0, 8, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 0, 0, 0],
+            [0, 0, 4, 0, 8, 3, 7, 0, 0],
+            [0, 0, 0, 5, 0, 7, 0, 0, 2],
+            [0, 0, 6, 0, 0, 0, 0, 0, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    simple_coloring = techniques.SimpleColoring(sudoku).first()
+
+    assert simple_coloring.combination.cells == [
+        Cell(position=Position(0, 4, 1), candidates={1, 2, 3, 5, 6, 7}),
+        Cell(position=Position(0, 5, 1), candidates={1, 2, 4, 5, 6}),
+        Cell(position=Position(8, 4, 7), candidates={1, 2, 9}),
+        Cell(position=Position(8, 5, 7), candidates={1, 2, 4, 9}),
+    ]
+    assert simple_coloring.combination.values == [2]
+    assert simple_coloring.changes == [
+        Cell(position=Position(8, 1, 6), candidates={1, 5, 7, 8}),
+    ]
+
+
+@pytest.mark.parametrize(
+    "technique",
+    [
+        techniques.HiddenPair,
+        techniques.HiddenTriplet,
+        techniques.BoxLineReduction,
+        techniques.XWing,
+        techniques.Swordfish,
+    ],
+)
+def test_subsets_and_fish_not_found(technique):
+    sudoku = make_sudoku_with_marks(
+        [
+            [0, 6, 0, 8, 0, 2, 3, 7, 1],
+            [3, 0, 7, 1, 6, 5, 8, 0, 4],
+            [0, 8, 1, 3, 7, 0, 5, 6, 0],
+            [8, 7, 4, 9, 2, 3, 1, 5, 6],
+            [9, 1, 3, 6, 5, 8, 2, 4, 7],
+            [6, 0, 0, 4, 1, 7, 9, 3, 8],
+            [0, 3, 8, 0, 0, 0, 6, 1, 5],
+            [0, 0, 6, 0, 8, 1, 4, 0, 3],
+            [1, 4, 0, 5, 3, 6, 7, 8, 0],
+        ],
+        box_size=BoxSize(3, 3),
+    )
+
+    with pytest.raises(techniques.NotFound):
+        technique(sudoku).first()
+
+
 def test_unique_rectangle():
     sudoku = make_sudoku_with_marks(
         [